@@ -0,0 +1,327 @@
+"""
+Performance benchmarks for the priority queue and the simulation step.
+
+maxheap.run_all_tests only checks correctness. This script times the heap
+operations the simulation relies on (add, remove_max, remove, update_priority
+and _heapify) at queue sizes from 10 to 1M, and the per-minute work of the
+simulation (simulation_step, find_runway and update_gui_elements) at several
+traffic rates. Results are written as JSON so runs can be compared; with
+--baseline the new results are checked against an earlier file and the script
+exits with status 1 if anything got slower than the tolerance allows.
+
+update_gui_elements is timed against real Tk widgets when a display is
+available (for example under xvfb-run) and against stub widgets otherwise, so
+the stub numbers cover only the Python side of a GUI refresh. Example:
+
+    python bench.py --output bench.json
+    python bench.py --max-size 10000 --baseline bench.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+import core_functions as cf
+import event_engine
+import event_log
+import maxheap
+import simulation
+
+HEAP_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+HEAP_OPS = 1000  # operations timed per heap benchmark
+TRAFFIC_RATES = {
+    # name: (LANDING_TRAFFIC_PROBABILITY, TAKEOFF_TRAFFIC_PROBABILITY)
+    "low": (0.1, 0.02),
+    "default": (cf.LANDING_TRAFFIC_PROBABILITY, cf.TAKEOFF_TRAFFIC_PROBABILITY),
+    "high": (0.6, 0.15),
+}
+WARMUP_MINUTES = 300  # minutes simulated before timing, so queues and runways are in use
+STEP_MINUTES = 1000   # simulation_step calls timed per traffic rate
+FIND_RUNWAY_CALLS = 10000
+GUI_UPDATES = 20
+
+def _timed(function, *args):
+    """Return the seconds taken by one call of function(*args)."""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+# --- Heap Benchmarks ---
+
+def _add_batch(heap, items):
+    for key, value in items:
+        maxheap.add(heap, key, value)
+
+def _remove_batch(heap, values):
+    for value in values:
+        maxheap.remove(heap, value)
+
+def _update_batch(heap, updates):
+    for value, key in updates:
+        maxheap.update_priority(heap, value, key)
+
+def bench_heap_size(n, ops, repeat, rng):
+    """
+    Time each heap operation on a heap holding n items.
+
+    Operations are done in rounds of at most n, and the heap is brought back to
+    n items between rounds without timing, so small heaps are measured at their
+    own size rather than growing or emptying during the benchmark.
+
+    Returns:
+        dict: Microseconds per operation (per call for _heapify), best of `repeat`
+    """
+    heap = maxheap.heapify_from(((rng.random(), object()) for _ in range(n)), indexed=True)
+    batch = min(n, ops)
+    rounds = max(1, ops // batch)
+    results = {}
+
+    def best(run_round):
+        return min(sum(run_round() for _ in range(rounds)) for _ in range(repeat)) / (rounds * batch) * 1e6
+
+    def add_round():
+        items = [(rng.random(), object()) for _ in range(batch)]
+        elapsed = _timed(_add_batch, heap, items)
+        _remove_batch(heap, [value for _, value in items])
+        return elapsed
+
+    def remove_max_round():
+        removed = []
+        elapsed = _timed(lambda: removed.extend(maxheap.remove_max(heap) for _ in range(batch)))
+        _add_batch(heap, removed)
+        return elapsed
+
+    def remove_round():
+        items = rng.sample(list(heap), batch)
+        elapsed = _timed(_remove_batch, heap, [value for _, value in items])
+        _add_batch(heap, items)
+        return elapsed
+
+    def update_round():
+        updates = [(heap[rng.randrange(n)][1], rng.random()) for _ in range(batch)]
+        return _timed(_update_batch, heap, updates)
+
+    results["add"] = best(add_round)
+    results["remove_max"] = best(remove_max_round)
+    results["remove"] = best(remove_round)
+    results["update_priority"] = best(update_round)
+
+    def heapify_round():
+        rng.shuffle(heap)
+        for i, item in enumerate(heap):
+            heap.positions[id(item[1])] = i
+        return _timed(maxheap._heapify, heap)
+
+    results["_heapify"] = min(heapify_round() for _ in range(repeat)) * 1e6
+    return results
+
+def bench_heap(sizes, ops, repeat, seed):
+    """Run bench_heap_size for every size. Returns {operation: {size: microseconds}}."""
+    rng = random.Random(seed)
+    results = {}
+    for n in sizes:
+        for operation, micros in bench_heap_size(n, ops, repeat, rng).items():
+            results.setdefault(operation, {})[str(n)] = micros
+    return results
+
+# --- Simulation Benchmarks ---
+
+def _reset_simulation():
+    """Put the simulation modules back into their start-up state."""
+    cf.reset_state()
+    if cf.holding_table is not None:
+        cf.holding_table.disable()
+    event_engine.started = False
+
+class _StubWidget:
+    """Stands in for a Treeview or Label when no display is available."""
+
+    def insert(self, *args, **kwargs):
+        pass
+
+    def delete(self, *args):
+        pass
+
+    def item(self, *args, **kwargs):
+        pass
+
+    def move(self, *args):
+        pass
+
+    def config(self, **kwargs):
+        pass
+
+def _gui_widgets():
+    """
+    Point gui_functions at widgets that update_gui_elements can draw into.
+
+    Returns:
+        tuple: (gui_functions module or None, "tk", "stub" or the reason it was skipped)
+    """
+    try:
+        import gui_functions as gui
+    except ImportError as error:
+        return None, f"skipped ({error})"
+    try:
+        gui.root = gui.tk.Tk()
+        gui.root.withdraw()
+        make_tree = lambda: gui.ttk.Treeview(gui.root, columns=("Priority", "ID", "Type", "Special", "Fuel", "Status"))
+        make_label = lambda: gui.tk.Label(gui.root)
+        backend = "tk"
+    except gui.tk.TclError:
+        gui.root = None
+        make_tree = make_label = _StubWidget
+        backend = "stub"
+    for size in ["Small", "Medium", "Large"]:
+        gui.landing_trees[size] = make_tree()
+        gui.takeoff_trees[size] = make_tree()
+    gui.runway_labels = [make_label() for _ in cf.runways]
+    gui.landing_label = make_label()
+    gui.takeoff_label = make_label()
+    gui.completed_label = make_label()
+    gui.diverted_label = make_label()
+    gui.emergency_label = make_label()
+    return gui, backend
+
+def bench_traffic_rate(landing_probability, takeoff_probability, seed, gui):
+    """
+    Time the per-minute simulation work at one traffic rate.
+
+    Returns:
+        dict: Microseconds per simulation_step, find_runway and update_gui_elements
+              call, and the number of queued flights after warm-up
+    """
+    _reset_simulation()
+    cf.LANDING_TRAFFIC_PROBABILITY = landing_probability
+    cf.TAKEOFF_TRAFFIC_PROBABILITY = takeoff_probability
+    random.seed(seed)
+    for _ in range(WARMUP_MINUTES):
+        simulation.simulation_step()
+    result = {
+        "landing_probability": landing_probability,
+        "takeoff_probability": takeoff_probability,
+        "queued": sum(len(q) for q in cf.landing_queues.values()) + sum(len(q) for q in cf.takeoff_queues.values()),
+        "free_runways": len(cf.free_runways),
+    }
+
+    planes = [cf.generate_plane(is_arrival=random.random() < 0.5) for _ in range(100)]
+    def find_runways():
+        for i in range(FIND_RUNWAY_CALLS):
+            cf.find_runway(planes[i % len(planes)])
+    result["find_runway_us"] = _timed(find_runways) / FIND_RUNWAY_CALLS * 1e6
+
+    if gui is not None:
+        gui.rendered_rows.clear()
+        gui.update_gui_elements()  # first refresh inserts every row; time the steady state
+        elapsed = 0.0
+        for _ in range(GUI_UPDATES):
+            simulation.simulation_step()
+            elapsed += _timed(gui.update_gui_elements)
+        result["update_gui_elements_us"] = elapsed / GUI_UPDATES * 1e6
+
+    step = simulation.simulation_step
+    def steps():
+        for _ in range(STEP_MINUTES):
+            step()
+    result["simulation_step_us"] = _timed(steps) / STEP_MINUTES * 1e6
+    return result
+
+def bench_simulation(seed, repeat, with_gui=True):
+    """
+    Run bench_traffic_rate for every entry of TRAFFIC_RATES.
+
+    Each rate is run `repeat` times from the same seed, so every run simulates
+    the same traffic, and the best time of each measurement is kept.
+    """
+    defaults = (cf.LANDING_TRAFFIC_PROBABILITY, cf.TAKEOFF_TRAFFIC_PROBABILITY)
+    _reset_simulation()  # the runway labels are made from cf.runways
+    gui, backend = _gui_widgets() if with_gui else (None, "skipped")
+    results = {"gui_backend": backend}
+    try:
+        for name, (landing, takeoff) in TRAFFIC_RATES.items():
+            runs = [bench_traffic_rate(landing, takeoff, seed, gui) for _ in range(repeat)]
+            results[name] = {key: min(run[key] for run in runs) if key.endswith("_us") else value
+                             for key, value in runs[0].items()}
+    finally:
+        cf.LANDING_TRAFFIC_PROBABILITY, cf.TAKEOFF_TRAFFIC_PROBABILITY = defaults
+        if gui is not None and gui.root is not None:
+            gui.root.destroy()
+    return results
+
+# --- Comparison ---
+
+def _timings(results, prefix=""):
+    """Flatten the timing entries of a result dict to {dotted.path: microseconds}."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_timings(value, path + "."))
+        elif isinstance(value, float) and (prefix.startswith("heap.") or key.endswith("_us")):
+            flat[path] = value
+    return flat
+
+def compare(results, baseline, tolerance):
+    """
+    Find timings that got slower than a baseline run by more than the tolerance.
+
+    Args:
+        results: Results of this run
+        baseline: Results loaded from an earlier run
+        tolerance: Allowed slowdown as a fraction (0.25 means 25% slower)
+
+    Returns:
+        list: (path, baseline microseconds, new microseconds) for every regression
+    """
+    old = _timings(baseline)
+    regressions = []
+    for path, micros in _timings(results).items():
+        if path in old and micros > old[path] * (1 + tolerance):
+            regressions.append((path, old[path], micros))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the priority queue and the simulation step.")
+    parser.add_argument("--output", metavar="PATH", help="write the results to this JSON file (default: print them)")
+    parser.add_argument("--max-size", type=int, default=HEAP_SIZES[-1], help="largest heap size to benchmark")
+    parser.add_argument("--ops", type=int, default=HEAP_OPS, help="operations timed per heap benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per benchmark; the best time is kept")
+    parser.add_argument("--seed", type=int, default=1, help="seed for heap keys and simulation traffic")
+    parser.add_argument("--no-gui", action="store_true", help="do not time update_gui_elements")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against an earlier JSON result")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (default: 0.25)")
+    args = parser.parse_args()
+
+    event_log.level = event_log.OFF
+    sizes = [n for n in HEAP_SIZES if n <= args.max_size]
+    results = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ops": args.ops,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "heap": bench_heap(sizes, args.ops, args.repeat, args.seed),
+        "simulation": bench_simulation(args.seed, args.repeat, not args.no_gui),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for path, old, new in regressions:
+            print(f"REGRESSION {path}: {old:.2f}us -> {new:.2f}us ({new / old - 1:+.0%})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Checkpoints: save the whole simulation state to a file and resume from it.
+
+A checkpoint holds everything a run depends on: the clock, queues, runways,
+flights, runway reservations, counters, the tunable constants, the random
+generator state and the event engine's pending events. It is a single pickle,
+so a flight referenced from several places (its queue, active_flights, a
+runway) is still one object after loading. The indexed heaps' position maps
+and the tournament boards are keyed by object identity, so they are rebuilt on
+load instead of stored.
+
+A schedule feed (simulation.traffic_feed) reads its file lazily and is not
+stored; the checkpoint records how many flights it had released, and after a
+load schedule_rows tells the caller how many rows to skip when it reopens the
+file (see run.py).
+
+Files are written through a large write buffer and read back through a
+memory map. snapshot() and restore() do the same in memory, which is the
+cheap way to fork several what-if runs from one warmed-up state. Resuming
+with the engine that wrote the checkpoint continues exactly as an unbroken
+run would.
+"""
+import mmap
+import pickle
+import random
+import core_functions as cf
+import event_engine
+import simulation
+import tournament
+
+MAGIC = b"ATCCKPT5"  # file signature and format version
+WRITE_BUFFER = 1 << 20
+
+SETTINGS = ["FUEL_EMERGENCY_THRESHOLD", "HOLDING_PATTERN_FUEL_BURN", "MAX_HOLDING_TIME",
+            "SIMULATION_SPEED", "PRIORITY_EPOCH", "LANDING_TRAFFIC_PROBABILITY",
+            "TAKEOFF_TRAFFIC_PROBABILITY"]
+ENGINE_STATE = ["started", "now", "traffic_checked", "traffic_minute", "traffic_landing"]
+
+# Flights released by the schedule feed when the last loaded checkpoint was taken (0 without a feed)
+schedule_rows = 0
+
+def _state():
+    """Collect the simulation state into one picklable dict."""
+    if cf.holding_table is not None:
+        cf.holding_table.sync()
+    return {
+        "settings": {name: getattr(cf, name) for name in SETTINGS},
+        "system_time": cf.system_time,
+        "clock_origin": cf.clock_origin,
+        "landing_queues": {size: list(queue) for size, queue in cf.landing_queues.items()},
+        "takeoff_queues": {size: list(queue) for size, queue in cf.takeoff_queues.items()},
+        "pending_flights": list(cf.pending_flights),
+        "priority_epochs": cf.priority_epochs,
+        "runways": cf.runways,
+        "runway_bookings": cf.runway_bookings,
+        "active_flights": cf.active_flights,
+        "emergency_flights": list(cf.emergency_flights),
+        "holding_times": cf.holding_times,
+        "diverted_flights": cf.diverted_flights,
+        "completed_flights": cf.completed_flights,
+        "random": random.getstate(),
+        "engine": {name: getattr(event_engine, name) for name in ENGINE_STATE},
+        "engine_events": list(event_engine.events),
+        "schedule_released": simulation.traffic_feed.released if simulation.traffic_feed is not None else 0,
+    }
+
+def _load_queues(queues, board, saved):
+    """Refill queues in place (the boards reference them) and rebuild their position maps."""
+    for size, queue in queues.items():
+        queue.clear()
+        queue.positions.clear()
+        queue.extend(saved[size])
+        for i, item in enumerate(queue):
+            queue.positions[id(item[1])] = i
+    tournament.update_all(board)
+
+def snapshot():
+    """Return the current simulation state as bytes."""
+    return MAGIC + pickle.dumps(_state(), protocol=pickle.HIGHEST_PROTOCOL)
+
+def restore(data):
+    """
+    Replace the current simulation state with one taken by snapshot() or save().
+
+    Args:
+        data: Bytes (or any buffer, such as a memory map) holding a checkpoint
+
+    Raises:
+        ValueError: If data is not a checkpoint in this format
+    """
+    global schedule_rows
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a simulation checkpoint (or written by another version)")
+    state = pickle.loads(memoryview(data)[len(MAGIC):])
+
+    for name, value in state["settings"].items():
+        setattr(cf, name, value)
+    cf.system_time = state["system_time"]
+    cf.clock_origin = state["clock_origin"]
+    _load_queues(cf.landing_queues, cf.landing_board, state["landing_queues"])
+    _load_queues(cf.takeoff_queues, cf.takeoff_board, state["takeoff_queues"])
+    cf.pending_flights[:] = state["pending_flights"]
+    for direction, epochs in state["priority_epochs"].items():
+        cf.priority_epochs[direction].update(epochs)
+    cf.runways = state["runways"]
+    cf.index_runways()
+    cf.runway_bookings = state["runway_bookings"]
+    cf.active_flights.clear()
+    cf.active_flights.update(state["active_flights"])
+    cf.index_flights()
+    cf.emergency_flights.clear()
+    cf.emergency_flights.update(dict.fromkeys(state["emergency_flights"]))
+    cf.holding_times[:] = state["holding_times"]
+    cf.diverted_flights = state["diverted_flights"]
+    cf.completed_flights = state["completed_flights"]
+    random.setstate(state["random"])
+    schedule_rows = state["schedule_released"]
+
+    for name, value in state["engine"].items():
+        setattr(event_engine, name, value)
+    event_engine.events[:] = state["engine_events"]
+    event_engine.pending.clear()
+    event_engine.pending.update(minute for _, minute in event_engine.events)
+    if cf.holding_table is not None:
+        cf.holding_table.enable()  # track the restored holding flights instead of the old ones
+
+def save(path):
+    """Write the current simulation state to a checkpoint file."""
+    with open(path, "wb", buffering=WRITE_BUFFER) as file:
+        file.write(MAGIC)
+        pickle.dump(_state(), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+def load(path):
+    """Replace the current simulation state with the one saved in a checkpoint file."""
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            restore(data)
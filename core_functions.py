@@ -1,5 +1,11 @@
+import bisect
+import event_log
+import heapq
+import math
 import maxheap
 import random
+import runway_timeline
+import tournament
 from datetime import datetime, timedelta
 
 # --- Constants ---
@@ -7,104 +13,389 @@ FUEL_EMERGENCY_THRESHOLD = 15
 HOLDING_PATTERN_FUEL_BURN = 1
 MAX_HOLDING_TIME = 30
 SIMULATION_SPEED = 1.0
+PRIORITY_EPOCH = 5  # minutes between full recomputations of queued priorities
+EMERGENCY_PRIORITY = 10000
+LANDING_TRAFFIC_PROBABILITY = 0.3   # chance of a new arrival each minute
+TAKEOFF_TRAFFIC_PROBABILITY = 0.07  # chance of a new departure each minute
+PLANE_TYPES = [
+    {"type": "Small", "size": 1, "min_runway": 6000, "operation_time": 10},
+    {"type": "Medium", "size": 2, "min_runway": 8000, "operation_time": 15},
+    {"type": "Large", "size": 3, "min_runway": 10000, "operation_time": 20}
+]
+RUNWAY_LENGTHS = [6000, 6500, 8000, 9500, 11000, 12000, 13500]  # one runway per entry, in feet
 
 # --- Global Variables ---
 landing_queues = {
-    "Small": maxheap.create_heap_priority_queue(),  # Small planes
-    "Medium": maxheap.create_heap_priority_queue(), # Medium planes
-    "Large": maxheap.create_heap_priority_queue()   # Large planes
+    "Small": maxheap.create_indexed_priority_queue(),  # Small planes
+    "Medium": maxheap.create_indexed_priority_queue(), # Medium planes
+    "Large": maxheap.create_indexed_priority_queue()   # Large planes
 }
 takeoff_queues = {
-    "Small": maxheap.create_heap_priority_queue(),
-    "Medium": maxheap.create_heap_priority_queue(),
-    "Large": maxheap.create_heap_priority_queue()
+    "Small": maxheap.create_indexed_priority_queue(),
+    "Medium": maxheap.create_indexed_priority_queue(),
+    "Large": maxheap.create_indexed_priority_queue()
+}
+
+# Tournaments over each direction's queues (see tournament.py). Leaves follow
+# PLANE_TYPES, which is ordered by minimum runway length, so the queues whose
+# flights fit a runway are always a prefix of the leaves.
+QUEUE_ORDER = [plane_type["type"] for plane_type in PLANE_TYPES]
+QUEUE_MIN_RUNWAYS = [plane_type["min_runway"] for plane_type in PLANE_TYPES]
+queue_leaf = {size: i for i, size in enumerate(QUEUE_ORDER)}
+landing_board = tournament.create([landing_queues[size] for size in QUEUE_ORDER])
+takeoff_board = tournament.create([takeoff_queues[size] for size in QUEUE_ORDER])
+
+# Flights added before their scheduled time wait here, keyed by -scheduled_time
+# so the earliest is on top, until simulation.release_due_flights moves them
+# into their landing or takeoff queue. The queues then only hold flights that
+# can be dispatched now.
+pending_flights = maxheap.create_heap_priority_queue()
+
+# Epoch in which each queue's priorities were last recomputed
+priority_epochs = {
+    "landing": {"Small": None, "Medium": None, "Large": None},
+    "takeoff": {"Small": None, "Medium": None, "Large": None}
 }
 
 runways = []
+free_runways = []  # (length, id, runway) for every free runway, sorted by length
+runways_by_length = []  # (length, id, runway) for every runway, sorted by length
+free_runway_counts = {}  # plane type -> number of free runways long enough for it
 active_flights = {}
 diverted_flights = 0
 completed_flights = 0
-emergency_flights = []
-system_time = datetime.now()
+emergency_flights = {}  # Flight -> None, in the order they were declared
+holding_times = []  # minutes each flight spent holding before landing or diverting
+system_time = 0  # simulation clock, in whole minutes
+clock_origin = datetime.now()  # wall-clock time of minute 0, used only for display
+
+# Module that tracks holding flights in place of the per-minute loop in
+# update_plane_state (fuel_vector or holding_wheel), or None. Its enable()
+# and disable() set this.
+holding_table = None
+
+# Runway reservations made ahead of time for the flights waiting to land or take off
+# (see simulation.book_flight and runway_timeline.py), or None while
+# lookahead booking is off.
+runway_bookings = None
+
+# Live indexes over active_flights: the flights under each (is_arrival,
+# status, is_emergency) key, and the order they were registered in. Flights
+# join and leave through register_flight and unregister_flight, and change
+# key only through set_status, so a query such as "holding arrivals" visits
+# just the flights under its keys (see find_flights).
+flight_index = {}    # (is_arrival, status, is_emergency) -> [(registration number, Flight)], sorted
+flight_numbers = {}  # Flight -> registration number, which follows active_flights order
+flights_registered = 0
 
 def init_runways():
-    """Initialize the runway configuration."""
+    """Initialize the runway configuration from RUNWAY_LENGTHS."""
     global runways
     runways = [
-        {"id": 1, "length": 6000, "is_occupied": False, "time_available": system_time, "current_plane": None},  
-        {"id": 2, "length": 6500, "is_occupied": False, "time_available": system_time, "current_plane": None}, 
-        {"id": 3, "length": 8000, "is_occupied": False, "time_available": system_time, "current_plane": None},  
-        {"id": 4, "length": 9500, "is_occupied": False, "time_available": system_time, "current_plane": None},  
-        {"id": 5, "length": 11000, "is_occupied": False, "time_available": system_time, "current_plane": None},
-        {"id": 6, "length": 12000, "is_occupied": False, "time_available": system_time, "current_plane": None}, 
-        {"id": 7, "length": 13500, "is_occupied": False, "time_available": system_time, "current_plane": None}
+        {"id": i, "length": length, "is_occupied": False, "time_available": system_time, "current_plane": None, "busy_minutes": 0}
+        for i, length in enumerate(RUNWAY_LENGTHS, start=1)
     ]
+    index_runways()
+
+def reset_state():
+    """
+    Put all simulation state back to how it is at start-up, with fresh runways.
+
+    The constants are left alone, so a caller can change them and then start a
+    new run in the same process (see sweep.py).
+    """
+    global diverted_flights, completed_flights, system_time
+    for queues, board in ((landing_queues, landing_board), (takeoff_queues, takeoff_board)):
+        for queue in queues.values():
+            queue.clear()
+            queue.positions.clear()
+        tournament.update_all(board)
+    pending_flights.clear()
+    for epochs in priority_epochs.values():
+        for size in epochs:
+            epochs[size] = None
+    active_flights.clear()
+    index_flights()
+    emergency_flights.clear()
+    holding_times.clear()
+    diverted_flights = 0
+    completed_flights = 0
+    system_time = 0
+    init_runways()
+    if runway_bookings is not None:
+        reset_bookings()
+
+def reset_bookings():
+    """Start an empty reservation timeline for the current runways (turns lookahead booking on)."""
+    global runway_bookings
+    runway_bookings = runway_timeline.create(runway["id"] for runway in runways)
+
+def index_runways():
+    """Rebuild the runway indexes and per-type counters from the runway list."""
+    runways_by_length[:] = sorted((r["length"], r["id"], r) for r in runways)
+    free_runways[:] = sorted((r["length"], r["id"], r) for r in runways if not r["is_occupied"])
+    for plane_type in PLANE_TYPES:
+        free_runway_counts[plane_type["type"]] = sum(1 for r in runways
+                                                     if not r["is_occupied"] and r["length"] >= plane_type["min_runway"])
+
+def _count_runway(runway, change):
+    """Add change to the counter of every plane type the runway is long enough for."""
+    for plane_type in PLANE_TYPES:
+        if runway["length"] >= plane_type["min_runway"]:
+            free_runway_counts[plane_type["type"]] += change
+
+def occupy_runway(runway, plane, until):
+    """Assign a plane to a free runway until the given time."""
+    runway["is_occupied"] = True
+    runway["current_plane"] = plane
+    runway["time_available"] = until
+    del free_runways[bisect.bisect_left(free_runways, (runway["length"], runway["id"]))]
+    _count_runway(runway, -1)
+
+def release_runway(runway):
+    """Mark an occupied runway as free again."""
+    runway["is_occupied"] = False
+    runway["current_plane"] = None
+    bisect.insort(free_runways, (runway["length"], runway["id"], runway))
+    _count_runway(runway, 1)
+
+def queue_changed(board, size):
+    """Update a board after the head of one of its queues may have changed."""
+    tournament.update(board, queue_leaf[size])
+
+def best_flight_for(board, runway):
+    """
+    Return the highest-priority queue head on a board whose aircraft fits a runway.
+
+    Args:
+        board: landing_board or takeoff_board
+        runway: The runway to fill
+
+    Returns:
+        tuple: (priority, plane) of that queue head, or None if no queued flight fits
+    """
+    i = tournament.best_in(board, 0, bisect.bisect_right(QUEUE_MIN_RUNWAYS, runway["length"]))
+    return tournament.head(board, i) if i != -1 else None
+
+def clock_time(minute):
+    """Wall-clock datetime of a simulation minute, for labels and log messages."""
+    return clock_origin + timedelta(minutes=minute)
+
+def priority_epoch_of(when):
+    """Index of the PRIORITY_EPOCH-minute bucket that contains a system time."""
+    return when // PRIORITY_EPOCH
+
+def priority_epoch_start(epoch):
+    """System time at which a priority epoch begins."""
+    return epoch * PRIORITY_EPOCH
+
+def holding_deadlines(plane):
+    """
+    Times at which a holding flight will hit its fuel or holding limits.
+
+    Fuel burns by HOLDING_PATTERN_FUEL_BURN each minute spent holding, so from
+    the fuel a flight has now, its low-fuel emergency, critical-fuel diversion
+    and maximum holding time are all known in advance.
+
+    Args:
+        plane: A holding plane, with its fuel as of the current system time
+
+    Returns:
+        list: Deadlines as system times
+    """
+    fuel = plane.fuel_remaining
+    burn = HOLDING_PATTERN_FUEL_BURN
+    deadlines = [plane.holding_since + math.floor(MAX_HOLDING_TIME) + 1]
+    if burn > 0:
+        if not plane.is_emergency:
+            deadlines.append(system_time + max(1, math.ceil((fuel - FUEL_EMERGENCY_THRESHOLD) / burn)))
+        deadlines.append(system_time + max(1, math.floor((fuel - 5) / burn) + 1))
+    return deadlines
+
+class Flight:
+    """
+    A single arrival or departure.
+
+    Fields are fixed slots instead of a per-flight dict, which keeps each
+    record small, and flights compare by identity, so looking one up in a
+    queue or list never compares records field by field.
+    """
+    __slots__ = ("id", "is_arrival", "type", "size", "min_runway", "operation_time", "fuel_remaining",
+                 "scheduled_time", "is_vip", "is_medevac", "has_tight_connection", "is_emergency",
+                 "in_holding", "holding_since", "status")
+
+    def __init__(self, id, type, size, min_runway, operation_time, fuel_remaining, scheduled_time,
+                 is_vip=False, is_medevac=False, has_tight_connection=False, is_emergency=False, is_arrival=True):
+        self.id = id
+        self.is_arrival = is_arrival
+        self.type = type
+        self.size = size
+        self.min_runway = min_runway
+        self.operation_time = operation_time
+        self.fuel_remaining = fuel_remaining
+        self.scheduled_time = scheduled_time
+        self.is_vip = is_vip
+        self.is_medevac = is_medevac
+        self.has_tight_connection = has_tight_connection
+        self.is_emergency = is_emergency
+        self.in_holding = False
+        self.holding_since = None
+        self.status = "Scheduled"
+
+    def __repr__(self):
+        return f"Flight({self.id}, {self.type}, {self.status})"
 
 def generate_plane(is_arrival=True):
     """Generate a random plane with appropriate attributes."""
-    plane_types = [
-        {"type": "Small", "size": 1, "min_runway": 6000, "operation_time": 10},
-        {"type": "Medium", "size": 2, "min_runway": 8000, "operation_time": 15},
-        {"type": "Large", "size": 3, "min_runway": 10000, "operation_time": 20}
-    ]
-    plane_type = random.choice(plane_types)
+    plane_type = random.choice(PLANE_TYPES)
     plane_id = f"{'A' if is_arrival else 'D'}{random.randint(100, 999)}"
     fuel = random.randint(30, 120) if is_arrival else 120
-    plane = {
-        "id": plane_id, "type": plane_type["type"], "size": plane_type["size"],
-        "min_runway": plane_type["min_runway"], "operation_time": plane_type["operation_time"],
-        "fuel_remaining": fuel, "scheduled_time": system_time + timedelta(minutes=random.randint(0, 5)),
-        "is_vip": random.random() < 0.05, "is_medevac": random.random() < 0.03,
-        "has_tight_connection": random.random() < 0.1, "is_emergency": random.random() < 0.03 if plane_id[0] == "D" else False,
-        "in_holding": False, "holding_since": None, "status": "Scheduled"
-    }
+    plane = Flight(
+        id=plane_id, type=plane_type["type"], size=plane_type["size"],
+        min_runway=plane_type["min_runway"], operation_time=plane_type["operation_time"],
+        fuel_remaining=fuel, scheduled_time=system_time + random.randint(0, 5),
+        is_vip=random.random() < 0.05, is_medevac=random.random() < 0.03,
+        has_tight_connection=random.random() < 0.1, is_emergency=random.random() < 0.03 if not is_arrival else False,
+        is_arrival=is_arrival
+    )
     return plane
 
+def unique_flight_id(flight_id):
+    """
+    Return an id for a new flight that no active flight is using.
+
+    Flight numbers can repeat (generated ones are drawn from A100-A999, and a
+    schedule can reuse a callsign), so a number that is already active gets a
+    suffix: A512, A512-2, A512-3, ...
+    """
+    if flight_id not in active_flights:
+        return flight_id
+    n = 2
+    while f"{flight_id}-{n}" in active_flights:
+        n += 1
+    return f"{flight_id}-{n}"
+
+def _index_key(plane):
+    return (plane.is_arrival, plane.status, plane.is_emergency)
+
+def _unindex(plane):
+    """Take a registered flight out of the list under its current key."""
+    entries = flight_index[_index_key(plane)]
+    del entries[bisect.bisect_left(entries, (flight_numbers[plane],))]
+
+def register_flight(plane):
+    """Add a flight to active_flights under its id and to the flight indexes."""
+    global flights_registered
+    active_flights[plane.id] = plane
+    flights_registered += 1
+    flight_numbers[plane] = flights_registered
+    flight_index.setdefault(_index_key(plane), []).append((flights_registered, plane))  # newest number: goes last
+
+def unregister_flight(plane_id):
+    """Remove the flight with the given id, if there is one, from active_flights and the flight indexes."""
+    plane = active_flights.pop(plane_id, None)
+    if plane is not None:
+        _unindex(plane)
+        del flight_numbers[plane]
+
+def set_status(plane, status, emergency=None):
+    """
+    Change a flight's status, and its emergency flag when one is given.
+
+    All status changes go through here so the flight indexes stay current. A
+    flight that is not active just gets the new values.
+    """
+    registered = plane in flight_numbers
+    if registered:
+        _unindex(plane)
+    plane.status = status
+    if emergency is not None:
+        plane.is_emergency = emergency
+    if registered:
+        bisect.insort(flight_index.setdefault(_index_key(plane), []), (flight_numbers[plane], plane))
+
+def index_flights():
+    """Rebuild the flight indexes from active_flights (after it was replaced wholesale, e.g. by a checkpoint)."""
+    global flights_registered
+    flight_index.clear()
+    flight_numbers.clear()
+    flights_registered = 0
+    for plane in list(active_flights.values()):
+        register_flight(plane)
+
+def find_flights(match, ordered=True):
+    """
+    List the active flights under the index keys that pass a test.
+
+    Only the flights under matching keys are visited, so asking for a small
+    group (holding arrivals, emergencies) does not scan every active flight.
+    Each key's flights are kept in registration order, so putting the result
+    in active_flights order is a merge of the matching keys' lists.
+
+    Args:
+        match: Function of (is_arrival, status, is_emergency) that is True for the keys wanted
+        ordered: Return the flights in active_flights order; callers whose
+                 outcome does not depend on the order can skip the merge
+
+    Returns:
+        list: The matching flights
+    """
+    lists = [entries for key, entries in flight_index.items() if entries and match(*key)]
+    if ordered and len(lists) > 1:
+        return [plane for _, plane in heapq.merge(*lists)]
+    return [plane for entries in lists for _, plane in entries]
+
 def calculate_landing_priority(plane):
     """Calculate priority score for a landing aircraft."""
-    if plane['status'] in ["Completed", "Diverted"]:
+    if plane.status in ["Completed", "Diverted"]:
         return 0
 
-    size_priority = plane["size"] * 10
-    if plane["is_emergency"]:
-        return 10000
+    size_priority = plane.size * 10
+    if plane.is_emergency:
+        return EMERGENCY_PRIORITY
     special_factor = 0
-    if plane["is_medevac"]: special_factor += 50
-    if plane["is_vip"]: special_factor += 30
-    if plane["has_tight_connection"]: special_factor += 20
-    fuel_factor = (FUEL_EMERGENCY_THRESHOLD / plane['fuel_remaining']) * 100 
-    time_diff = abs((plane["scheduled_time"] - system_time).total_seconds() / 60)
+    if plane.is_medevac: special_factor += 50
+    if plane.is_vip: special_factor += 30
+    if plane.has_tight_connection: special_factor += 20
+    fuel_factor = (FUEL_EMERGENCY_THRESHOLD / plane.fuel_remaining) * 100 
+    time_diff = abs(plane.scheduled_time - system_time)
     time_factor = max(0, 30 - time_diff)
     return size_priority + special_factor + fuel_factor + time_factor
 
 def calculate_takeoff_priority(plane):
     """Calculate priority score for a takeoff aircraft."""
-    size_priority = plane["size"] * 10
+    size_priority = plane.size * 10
     special_factor = 0
-    if plane["is_medevac"]: special_factor += 50
-    if plane["is_vip"]: special_factor += 30
-    time_diff = (system_time - plane["scheduled_time"]).total_seconds() / 60
+    if plane.is_medevac: special_factor += 50
+    if plane.is_vip: special_factor += 30
+    time_diff = system_time - plane.scheduled_time
     time_factor = max(0, time_diff) * 2
     return special_factor + size_priority + time_factor
 
-def log_event(message):
+def log_event(message, level=event_log.INFO):
     """Log an event with timestamp."""
-    timestamp = system_time.strftime("%H:%M:%S")
-    full_message = f"[{timestamp}] {message}"
-    print(full_message)  # Keep console output for debugging
-    
+    if not event_log.is_enabled(level):
+        return
+    timestamp = clock_time(system_time).strftime("%H:%M:%S")
+    event_log.write(f"[{timestamp}] {message}", level)
+
 
 def find_runway(plane):
-    """Finds the shortest available runway that meets the plane's minimum length requirement."""
-    available_runways = []
-    for runway in runways:
-        if not runway["is_occupied"] and runway["length"] >= plane["min_runway"]:
-            available_runways.append((runway["length"], runway["id"]))
-
-    if available_runways:
-        available_runways.sort()
-        runway_id_to_use = available_runways[0][1]
-        for runway in runways:
-            if runway["id"] == runway_id_to_use:
-                return runway
-    return None
\ No newline at end of file
+    """
+    Finds the shortest available runway that meets the plane's minimum length requirement.
+
+    With lookahead booking on, a runway is passed over if the operation would
+    run into another flight's reservation on it, unless the plane is an
+    emergency (its landing moves those reservations instead).
+    """
+    i = bisect.bisect_left(free_runways, (plane.min_runway,))
+    if runway_bookings is None or plane.is_emergency:
+        if i < len(free_runways):
+            return free_runways[i][2]
+        return None
+    end = system_time + plane.operation_time
+    for j in range(i, len(free_runways)):
+        runway = free_runways[j][2]
+        if not runway_timeline.conflicts(runway_bookings, runway["id"], system_time, end, ignore=plane):
+            return runway
+    return None
@@ -0,0 +1,302 @@
+"""
+Discrete-event driver for the simulation.
+
+simulation_step processes every minute, even when nothing can change until the
+next runway frees up or the next flight becomes due. This driver keeps a
+time-ordered heap of the minutes at which something can happen (runway
+releases, scheduled times, holding deadlines, new traffic, priority epochs) and jumps the clock
+straight to the next one, running the usual phases from simulation.process_minute
+only there.
+
+The minutes that are skipped are applied in bulk: holding flights burn their
+fuel and nothing else changes. Traffic uses the same per-minute random draws as
+generate_traffic, so a run gives the same outcome as calling simulation_step
+once per minute with the same seed. With a schedule feed (simulation.traffic_feed)
+the minutes at which it releases flights are events instead. Time always
+advances in one-minute steps here; SIMULATION_SPEED is only used by the GUI loop.
+"""
+import random
+import core_functions as cf
+import maxheap
+import runway_timeline
+import simulation
+
+# --- Engine State ---
+started = False         # whether reset() has run
+now = 0                 # current minute; the same as cf.system_time between runs
+events = maxheap.create_heap_priority_queue()  # keyed by -minute so the earliest is on top
+pending = set()         # minutes already waiting in events
+traffic_checked = 0     # last minute whose traffic draws have been made
+traffic_minute = None   # next minute with new traffic, if already drawn
+traffic_landing = False # whether that minute's arrival draw succeeded
+
+def schedule(minute):
+    """
+    Add a minute to the event heap unless it is already there or in the past.
+
+    Used as simulation.wakeup_hook.
+    """
+    if minute > now and minute not in pending:
+        pending.add(minute)
+        maxheap.add(events, -minute, minute)
+
+def reset():
+    """
+    Start event-driven timekeeping at the current system time.
+
+    Flights and runways that are already busy are scanned once so their
+    upcoming events are known.
+    """
+    global started, now, traffic_checked, traffic_minute, traffic_landing
+    started = True
+    now = cf.system_time
+    events.clear()
+    pending.clear()
+    traffic_checked = now
+    traffic_minute = None
+    traffic_landing = False
+
+    if cf.holding_table is not None:
+        cf.holding_table.sync()
+    schedule(now + 1)
+    for runway in cf.runways:
+        if runway["is_occupied"]:
+            schedule(runway["time_available"])
+    for plane in cf.active_flights.values():
+        schedule(plane.scheduled_time)
+        schedule(plane.scheduled_time + 1)
+        if plane.status == "Holding":
+            for deadline in cf.holding_deadlines(plane):
+                schedule(deadline)
+    if cf.runway_bookings is not None:
+        for _, start, _, _ in runway_timeline.reservations(cf.runway_bookings):
+            schedule(start)
+
+def draw_traffic(end):
+    """
+    Make generate_traffic's per-minute draws ahead of time until one produces a flight.
+
+    The arrival draw comes first each minute; if it succeeds, the departure draw
+    has to wait until the arrival has been generated, exactly as in
+    generate_traffic, so it is left for scheduled_traffic.
+
+    Args:
+        end: Last minute of the run; no draws are made past it
+    """
+    global traffic_checked, traffic_minute, traffic_landing
+    minute = traffic_checked
+    while minute < end:
+        minute += 1
+        if random.random() < cf.LANDING_TRAFFIC_PROBABILITY:
+            traffic_landing = True
+        elif random.random() < cf.TAKEOFF_TRAFFIC_PROBABILITY:
+            traffic_landing = False
+        else:
+            continue
+        traffic_minute = minute
+        schedule(minute)
+        break
+    traffic_checked = minute
+
+def scheduled_traffic():
+    """Add the flights drawn for the current minute by draw_traffic."""
+    if traffic_landing:
+        simulation.add_landing(cf.generate_plane(is_arrival=True))
+        if random.random() < cf.TAKEOFF_TRAFFIC_PROBABILITY:
+            simulation.add_takeoff(cf.generate_plane(is_arrival=False))
+    else:
+        simulation.add_takeoff(cf.generate_plane(is_arrival=False))
+
+def skip_minutes(count):
+    """
+    Apply `count` minutes in which no event happens, ending just before the next event.
+
+    Holding flights burn fuel for each of them. Emergency arrivals are re-flagged
+    as holding every minute while their runways are busy, so they end up as if
+    the last skipped minute had been processed.
+    """
+    if count <= 0:
+        return
+    burn = cf.HOLDING_PATTERN_FUEL_BURN * count
+    if cf.holding_table is not None:
+        cf.holding_table.burn(count)
+        # The table does not track emergencies, so the ones still holding burn here
+        for plane in cf.find_flights(lambda is_arrival, status, is_emergency: status == "Holding" and is_emergency,
+                                     ordered=False):
+            plane.fuel_remaining -= burn
+    else:
+        for plane in cf.find_flights(lambda is_arrival, status, is_emergency: status == "Holding", ordered=False):
+            plane.fuel_remaining -= burn
+
+    last = now + count
+    for plane in cf.emergency_flights:
+        if plane.is_arrival and plane.id in cf.active_flights:
+            if (cf.active_flights[plane.id] is plane and plane.scheduled_time < last
+                    and simulation.suitable_runways_occupied(plane)):
+                plane.in_holding = True
+                plane.holding_since = last
+            cf.set_status(plane, "Emergency (Priority Landing)")
+
+def next_event():
+    """Pop and return the next minute with an event, or None if there are none."""
+    while not maxheap.is_empty(events):
+        _, minute = maxheap.remove_max(events)
+        pending.discard(minute)
+        if minute > now:
+            return minute
+    return None
+
+def run(minutes):
+    """
+    Advance the simulation by a number of minutes, processing only minutes with events.
+
+    Args:
+        minutes: Number of simulated minutes to advance
+
+    Returns:
+        int: Number of minutes that were actually processed
+    """
+    global now, traffic_minute
+    if not started:
+        reset()
+    end = now + minutes
+    processed = 0
+    feed = simulation.traffic_feed
+    previous_hook = simulation.wakeup_hook
+    simulation.wakeup_hook = schedule
+    try:
+        while True:
+            if feed is not None:
+                release = feed.next_release()
+                if release is not None:
+                    schedule(max(release, now + 1))
+            elif traffic_minute is None:
+                draw_traffic(end)
+            minute = next_event()
+            if minute is None or minute > end:
+                if minute is not None:
+                    schedule(minute)  # keep it for the next run
+                skip_minutes(end - now)
+                now = cf.system_time = end
+                break
+
+            skip_minutes(minute - now - 1)
+            now = cf.system_time = minute
+            if feed is not None:
+                traffic = feed.release if release is not None and release <= minute else None
+            else:
+                traffic = scheduled_traffic if minute == traffic_minute else None
+            dispatched = simulation.process_minute(traffic)
+            if traffic is not None and feed is None:
+                traffic_minute = None
+            # New flights and runway assignments settle over the following minute
+            # (emergency re-keying, holding checks), so look at it too.
+            if dispatched or traffic is not None:
+                schedule(now + 1)
+            # Queued priorities are recomputed when the next epoch starts
+            if any(cf.landing_queues.values()) or any(cf.takeoff_queues.values()):
+                schedule(cf.priority_epoch_start(cf.priority_epoch_of(cf.system_time) + 1))
+            processed += 1
+    finally:
+        simulation.wakeup_hook = previous_hook
+    return processed
+
+# Testing
+
+def _random_schedule(seed, count):
+    """Flights for a schedule feed, about two every three minutes, with 15% of the arrivals emergencies."""
+    rng = random.Random(seed)
+    flights = []
+    minute = 0
+    for i in range(count):
+        minute += rng.randint(0, 1)
+        plane_type = rng.choice(cf.PLANE_TYPES)
+        is_arrival = rng.random() < 0.6
+        flights.append(cf.Flight(id=f"T{i}", type=plane_type["type"], size=plane_type["size"],
+                                 min_runway=plane_type["min_runway"], operation_time=plane_type["operation_time"],
+                                 fuel_remaining=rng.randint(20, 120), scheduled_time=minute,
+                                 is_emergency=is_arrival and rng.random() < 0.15, is_arrival=is_arrival))
+    return flights
+
+def _run_schedule(flights, minutes, event_driven, table=None):
+    """Run a schedule from a clean state and return the outcome the two engines must agree on."""
+    import schedule
+    cf.reset_state()
+    random.seed(1)
+    if table is not None:
+        table.enable()
+    simulation.traffic_feed = schedule.ScheduleFeed(flights)
+    try:
+        if event_driven:
+            reset()
+            run(minutes)
+        else:
+            for _ in range(minutes):
+                simulation.simulation_step()
+        if cf.holding_table is not None:
+            cf.holding_table.sync()
+        return (cf.completed_flights, cf.diverted_flights, sorted(cf.holding_times),
+                sorted((plane.id, plane.status, plane.fuel_remaining) for plane in cf.active_flights.values()))
+    finally:
+        simulation.traffic_feed = None
+        if table is not None:
+            table.disable()
+
+def test_engines_agree_on_schedules():
+    """The event engine with a holding table should match simulation_step on schedules with emergency arrivals."""
+    import event_log
+    import fuel_vector
+    import holding_wheel
+    tables = [holding_wheel] + ([fuel_vector] if fuel_vector.np is not None else [])
+    saved = (cf.RUNWAY_LENGTHS, cf.MAX_HOLDING_TIME, event_log.level)
+    event_log.level = event_log.OFF
+    try:
+        # Emergency arrivals queued for a single runway hold for a long time, outside the table
+        cf.RUNWAY_LENGTHS, cf.MAX_HOLDING_TIME = [10000], 1000
+        large = next(plane_type for plane_type in cf.PLANE_TYPES if plane_type["type"] == "Large")
+        def emergencies():
+            return [cf.Flight(id=f"E{i}", type="Large", size=large["size"], min_runway=large["min_runway"],
+                              operation_time=large["operation_time"], fuel_remaining=200,
+                              scheduled_time=10 + i, is_emergency=True) for i in range(12)]
+        expected = _run_schedule(emergencies(), 600, False)
+        for table in tables:
+            assert _run_schedule(emergencies(), 600, True, table) == expected, \
+                f"Event engine with {table.__name__} disagrees with simulation_step on held emergencies."
+
+        cf.RUNWAY_LENGTHS, cf.MAX_HOLDING_TIME = saved[:2]
+        for seed in (6, 13):
+            expected = _run_schedule(_random_schedule(seed, 600), 1200, False)
+            for table in tables:
+                assert _run_schedule(_random_schedule(seed, 600), 1200, True, table) == expected, \
+                    f"Event engine with {table.__name__} disagrees with simulation_step on schedule {seed}."
+    finally:
+        cf.RUNWAY_LENGTHS, cf.MAX_HOLDING_TIME, event_log.level = saved
+        cf.reset_state()
+
+def test_lookahead_keeps_departures_moving():
+    """Under heavy arrival traffic, lookahead booking should not leave the takeoff queues growing."""
+    import event_log
+    saved = (cf.LANDING_TRAFFIC_PROBABILITY, event_log.level)
+    event_log.level = event_log.OFF
+    try:
+        cf.LANDING_TRAFFIC_PROBABILITY = 0.45
+        cf.reset_state()
+        random.seed(11)
+        simulation.enable_lookahead()
+        longest = 0
+        for _ in range(4000):
+            simulation.simulation_step()
+            longest = max(longest, sum(len(queue) for queue in cf.takeoff_queues.values()))
+        assert longest <= 20, f"Takeoff queues reached {longest} flights with lookahead on."
+    finally:
+        simulation.disable_lookahead()
+        cf.LANDING_TRAFFIC_PROBABILITY, event_log.level = saved
+        cf.reset_state()
+
+def run_all_tests():
+    test_engines_agree_on_schedules()
+    test_lookahead_keeps_departures_moving()
+    print("All tests passed!")
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,117 @@
+"""
+Event log: a bounded ring buffer of log records with levels.
+
+Records are kept in memory in a fixed-size ring buffer, so long runs do not
+grow without limit. Readers such as the GUI poll records_since() to pick up
+everything logged since their last look in one batch. Console output is
+optional, and a log file can be attached; it is written by a background
+thread in batches so the simulation never waits on disk.
+"""
+import collections
+import itertools
+import queue
+import threading
+
+# --- Levels ---
+DEBUG = 10    # per-minute detail such as the simulation clock
+INFO = 20     # normal flight and runway events
+WARNING = 30  # emergencies and diversions
+OFF = 100     # drop everything
+
+BUFFER_SIZE = 5000   # records kept in memory
+FILE_BATCH_SIZE = 500  # records written per batch by the file writer
+
+# --- Log State ---
+level = DEBUG          # records below this level are dropped
+console = True         # also print records to the console
+console_level = DEBUG  # minimum level printed to the console
+buffer = collections.deque(maxlen=BUFFER_SIZE)  # (level, text) ring buffer
+count = 0              # records written since start; used as a read cursor
+file_writer = None
+
+def is_enabled(record_level):
+    """Return True if a record at this level would be kept."""
+    return record_level >= level
+
+def write(text, record_level=INFO):
+    """
+    Add a formatted record to the log.
+
+    Args:
+        text: The formatted log line
+        record_level: DEBUG, INFO or WARNING
+    """
+    global count
+    if record_level < level:
+        return
+    buffer.append((record_level, text))
+    count += 1
+    if console and record_level >= console_level:
+        print(text)
+    if file_writer is not None:
+        file_writer.queue.put(text)
+
+def records_since(cursor):
+    """
+    Return the records written after a cursor, and the new cursor.
+
+    If more records were written than the ring buffer holds, only the newest
+    BUFFER_SIZE are returned.
+
+    Args:
+        cursor: Value of count returned by the previous call (0 to start)
+
+    Returns:
+        tuple: (list of (level, text) records, new cursor)
+    """
+    new = min(count - cursor, len(buffer))
+    if new <= 0:
+        return [], count
+    return list(itertools.islice(buffer, len(buffer) - new, len(buffer))), count
+
+def clear():
+    """Drop all buffered records."""
+    global count
+    buffer.clear()
+    count = 0
+
+class _FileWriter(threading.Thread):
+    """Background thread that appends queued records to a file in batches."""
+
+    def __init__(self, path):
+        super().__init__(daemon=True)
+        self.file = open(path, "a", encoding="utf-8")
+        self.queue = queue.SimpleQueue()
+
+    def run(self):
+        while True:
+            lines = [self.queue.get()]
+            while len(lines) < FILE_BATCH_SIZE:
+                try:
+                    lines.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = None in lines
+            if done:
+                lines = lines[:lines.index(None)]
+            if lines:
+                self.file.write("\n".join(lines) + "\n")
+            if done:
+                self.file.close()
+                return
+            self.file.flush()
+
+def open_file(path):
+    """Start writing records to a log file (appending). Replaces any open log file."""
+    global file_writer
+    close_file()
+    file_writer = _FileWriter(path)
+    file_writer.start()
+
+def close_file():
+    """Write out any queued records and close the log file."""
+    global file_writer
+    if file_writer is not None:
+        file_writer.queue.put(None)
+        file_writer.join()
+        file_writer = None
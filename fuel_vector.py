@@ -0,0 +1,140 @@
+"""
+Vectorized holding-pattern update (optional, needs NumPy).
+
+update_plane_state walks every active flight in Python each minute. When this
+module is enabled, flights in the holding pattern are kept in NumPy arrays
+instead: fuel, the time they started holding and their emergency flag. Each
+minute the fuel burn, the low-fuel threshold and the diversion limits are
+applied to the whole table at once, and only the flights that crossed a limit
+are handed back to simulation.update_plane_state_tracked.
+
+Fuel on the Flight records of the other holding flights is written back
+lazily, so code that reads fuel_remaining outside the simulation step (queue
+priorities, the GUI) calls sync_flight() or sync() first. The scalar
+update_plane_state remains the reference implementation; the arrays only pay
+off once many flights are holding at the same time.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import sys
+import core_functions as cf
+
+INITIAL_CAPACITY = 64
+
+# --- Table State ---
+enabled = False
+flights = []     # Flight in each table slot
+slot_of = {}     # Flight -> slot
+fuel = None      # fuel remaining per slot
+since = None     # minute at which each flight started holding
+emergency = None # emergency flag per slot
+
+def enable():
+    """Start tracking holding flights in arrays. Raises ImportError without NumPy."""
+    global enabled, fuel, since, emergency
+    if np is None:
+        raise ImportError("fuel_vector needs NumPy (pip install numpy)")
+    if cf.holding_table is not None and cf.holding_table is not sys.modules[__name__]:
+        cf.holding_table.disable()
+    flights.clear()
+    slot_of.clear()
+    # Keep fuel integral when the burn rate is, so fuel_remaining stays an int
+    dtype = np.int64 if isinstance(cf.HOLDING_PATTERN_FUEL_BURN, int) else np.float64
+    fuel = np.zeros(INITIAL_CAPACITY, dtype=dtype)
+    since = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+    emergency = np.zeros(INITIAL_CAPACITY, dtype=bool)
+    enabled = True
+    cf.holding_table = sys.modules[__name__]
+    for plane in cf.find_flights(lambda is_arrival, status, is_emergency: status == "Holding" and not is_emergency):
+        track(plane)
+
+def disable():
+    """Write all fuel back to the flights and stop tracking them."""
+    global enabled
+    sync()
+    flights.clear()
+    slot_of.clear()
+    enabled = False
+    cf.holding_table = None
+
+def _grow():
+    global fuel, since, emergency
+    capacity = 2 * len(fuel)
+    fuel = np.concatenate([fuel, np.zeros(capacity - len(fuel), dtype=fuel.dtype)])
+    since = np.concatenate([since, np.zeros(capacity - len(since), dtype=since.dtype)])
+    emergency = np.concatenate([emergency, np.zeros(capacity - len(emergency), dtype=bool)])
+
+def track(plane):
+    """Add a flight that has just entered the holding pattern."""
+    if plane in slot_of:
+        return
+    i = len(flights)
+    if i == len(fuel):
+        _grow()
+    fuel[i] = plane.fuel_remaining
+    since[i] = plane.holding_since
+    emergency[i] = plane.is_emergency
+    flights.append(plane)
+    slot_of[plane] = i
+
+def untrack(plane):
+    """Stop tracking a flight, writing its current fuel back first."""
+    i = slot_of.pop(plane, None)
+    if i is None:
+        return
+    plane.fuel_remaining = fuel[i].item()
+    last = len(flights) - 1
+    if i != last:
+        moved = flights[last]
+        flights[i] = moved
+        fuel[i] = fuel[last]
+        since[i] = since[last]
+        emergency[i] = emergency[last]
+        slot_of[moved] = i
+    flights.pop()
+
+def sync_flight(plane):
+    """Write the current fuel of one flight back to its record, if it is tracked."""
+    i = slot_of.get(plane)
+    if i is not None:
+        plane.fuel_remaining = fuel[i].item()
+
+def sync():
+    """Write the current fuel of every tracked flight back to its record."""
+    for plane, value in zip(flights, fuel[:len(flights)].tolist()):
+        plane.fuel_remaining = value
+
+def burn(minutes):
+    """Burn fuel for a number of minutes in the holding pattern, with no limit checks."""
+    fuel[:len(flights)] -= cf.HOLDING_PATTERN_FUEL_BURN * minutes
+
+def update_holding():
+    """
+    Burn one minute of fuel for every holding flight and find those that crossed a limit.
+
+    A flight crosses a limit when it reaches the low-fuel emergency threshold,
+    falls below critical fuel or exceeds MAX_HOLDING_TIME. Those flights are
+    removed from the table with their fuel written back; the caller applies the
+    actual state changes.
+
+    Returns:
+        list: The flights that crossed a limit, in active_flights order
+    """
+    n = len(flights)
+    if n == 0:
+        return []
+    current = fuel[:n]
+    current -= cf.HOLDING_PATTERN_FUEL_BURN
+    held = cf.system_time - since[:n]
+    crossed = (((current <= cf.FUEL_EMERGENCY_THRESHOLD) & ~emergency[:n])
+               | (held > cf.MAX_HOLDING_TIME) | (current < 5))
+    changed = [flights[i] for i in np.flatnonzero(crossed).tolist()]
+    for plane in changed:
+        untrack(plane)
+    if len(changed) > 1:
+        # Handle them in the order the scalar loop would reach them
+        changed.sort(key=cf.flight_numbers.__getitem__)
+    return changed
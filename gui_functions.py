@@ -1,7 +1,9 @@
 import tkinter as tk
 from tkinter import ttk
 import core_functions as cf
+import event_log
 import main as sim
+import profiler
 
 # --- GUI Element Globals ---
 root = None
@@ -16,70 +18,142 @@ takeoff_label = None
 completed_label = None
 diverted_label = None
 emergency_label = None
+profile_label = None
+rendered_rows = {}  # Treeview -> rows last rendered into it (see update_treeview)
+log_cursor = 0  # event_log position already shown in log_text
+fast_forward_entry = None
+needs_redraw = False  # set by request_redraw, cleared when render_frame redraws
+
+LOG_MAX_LINES = 1000   # lines kept in the event log widget
+LOG_REFRESH_MS = 200   # how often new log records are copied into the widget
+PROFILE_LINES = 5      # slowest phases shown in the stats panel while profiling
+FRAME_RATE = 8         # redraws per second at most, however fast the simulation runs
+QUEUE_ROWS = 40        # flights listed per queue, best first; the labels give the full counts
 
 def update_treeview(tree, queue_data):
-    """Clears and repopulates a Treeview widget."""
-    for item in tree.get_children(): tree.delete(item)
+    """
+    Brings a Treeview in line with queue_data, touching only the rows that changed.
 
-    # Data is pre-filtered in update_gui_elements to avoid duplicate iids
-    # Items are inserted based on the sorted order from update_gui_elements
+    The rows last rendered into each tree are kept in rendered_rows, so rows
+    that are unchanged stay as they are, changed rows are updated in place,
+    and only rows that are new, gone or out of position are inserted, deleted
+    or moved.
+    """
+    rendered = rendered_rows.setdefault(tree, {"order": [], "rows": {}})
+    order = rendered["order"]
+    rows = rendered["rows"]
 
-    for i, item in enumerate(queue_data):
-        priority_str = f"{item['priority']:.1f}"
+    # Data is pre-filtered in update_gui_elements to avoid duplicate iids
+    new_rows = {}
+    for item in queue_data:
+        priority_str = f"{item['priority']:.1f}" if item['priority'] is not None else "-"
         fuel_str = f"{item['fuel']} min" if isinstance(item['fuel'], int) else "N/A"
         values = (priority_str, item['id'], item['type'], item['special'], fuel_str, item['status'])
-        tree.insert('', tk.END, iid=item['id'], values=values, tags=item['tags'])
+        new_rows[item['id']] = (values, item['tags'])
+
+    stale = [iid for iid in order if iid not in new_rows]
+    if stale:
+        tree.delete(*stale)
+        for iid in stale:
+            del rows[iid]
+        order[:] = [iid for iid in order if iid in new_rows]
+
+    # Items are placed based on the sorted order from update_gui_elements
+    for i, (iid, row) in enumerate(new_rows.items()):
+        if iid not in rows:
+            values, tags = row
+            tree.insert('', i, iid=iid, values=values, tags=tags)
+            order.insert(i, iid)
+        else:
+            if rows[iid] != row:
+                values, tags = row
+                tree.item(iid, values=values, tags=tags)
+            if order[i] != iid:
+                tree.move(iid, '', i)
+                order.remove(iid)
+                order.insert(i, iid)
+        rows[iid] = row
 
-def get_priority_queue_data(heap):
-    """Extracts and formats data from a heap clone for Treeview display."""
-    heap_clone = heap[:]
+def get_priority_queue_data(heap, limit=None):
+    """Extracts and formats heap data for Treeview display, highest priority first (at most limit rows)."""
     result = []
-    temp_storage = []
-
-    while not cf.maxheap.is_empty(heap_clone):
-        try:
-            priority, value = cf.maxheap.remove_max(heap_clone)
-            temp_storage.append((priority, value))
-
-            tags = []
-            special = ""  # For the 'Special' column display
-
-            # Determine primary background tag based on priority/status
-            if value["is_emergency"]:
-                tags.append("emergency")
-                special = "EMERGENCY"
-            elif value["is_medevac"]:
-                tags.append("medevac")
-                special = "MEDEVAC"
-            elif value["is_vip"]:
-                tags.append("vip")
-                special = "VIP"
-            elif value["status"] == "Holding":  # Check for holding status
-                tags.append("holding")  # Apply yellow background tag
-
-            # Add secondary tag for low fuel (text color)
-            fuel = value.get("fuel_remaining", "N/A")
-            if isinstance(fuel, int) and fuel <= cf.FUEL_EMERGENCY_THRESHOLD:
-                tags.append("lowfuel")
 
+    # Walk the top of the heap in order; the rest of the queue is never looked at
+    for priority, value in cf.maxheap.iter_sorted(heap, limit):
+        tags = []
+        special = ""  # For the 'Special' column display
+
+        # Determine primary background tag based on priority/status
+        if value.is_emergency:
+            tags.append("emergency")
+            special = "EMERGENCY"
+        elif value.is_medevac:
+            tags.append("medevac")
+            special = "MEDEVAC"
+        elif value.is_vip:
+            tags.append("vip")
+            special = "VIP"
+        elif value.status == "Holding":  # Check for holding status
+            tags.append("holding")  # Apply yellow background tag
+
+        # Add secondary tag for low fuel (text color)
+        fuel = value.fuel_remaining
+        if isinstance(fuel, int) and fuel <= cf.FUEL_EMERGENCY_THRESHOLD:
+            tags.append("lowfuel")
+
+        result.append({
+            "priority": priority, "id": value.id, "type": value.type,
+            "status": value.status, "special": special, "fuel": fuel,
+            "tags": tuple(tags)
+        })
+    return result
+
+def get_pending_data(is_arrival, size, limit=None):
+    """Formats the flights of one queue that are not due yet, earliest first, for Treeview display (at most limit rows)."""
+    result = []
+    if limit is not None and limit <= 0:
+        return result
+    for key, value in cf.maxheap.iter_sorted(cf.pending_flights):
+        if value.is_arrival == is_arrival and value.type == size:
             result.append({
-                "priority": priority, "id": value["id"], "type": value["type"],
-                "status": value["status"], "special": special, "fuel": fuel,
-                "tags": tuple(tags)
+                "priority": None, "id": value.id, "type": value.type,
+                "status": f"Due in {value.scheduled_time - cf.system_time}m", "special": "",
+                "fuel": value.fuel_remaining, "tags": ()
             })
-        except IndexError:
-            cf.log_event("Error reading heap clone for display.")
-            break
+            if len(result) == limit:
+                break
     return result
 
+def flush_log():
+    """Appends records logged since the last flush to the log widget in one batch."""
+    global log_cursor
+    records, log_cursor = event_log.records_since(log_cursor)
+    if not records or not log_text:
+        return
+    records = records[-LOG_MAX_LINES:]
+    log_text.config(state=tk.NORMAL)
+    for level, text in records:
+        log_text.insert(tk.END, text + "\n", "warning" if level >= event_log.WARNING else ())
+    # Keep the widget capped, dropping the oldest lines
+    excess = int(log_text.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+    if excess > 0:
+        log_text.delete("1.0", f"{excess + 1}.0")
+    log_text.config(state=tk.DISABLED)
+    log_text.yview(tk.END)
+
+def refresh_log():
+    """Flushes new log records to the widget, then schedules the next flush."""
+    flush_log()
+    root.after(LOG_REFRESH_MS, refresh_log)
+
 def update_info_labels():
     """Updates the text labels for runways and queue statistics."""
     for i, runway in enumerate(cf.runways):
         if i < len(runway_labels):
             if runway["is_occupied"]:
                 plane = runway["current_plane"]
-                time_left = max(0, (runway["time_available"] - cf.system_time).total_seconds())
-                status = f"R{runway['id']} ({runway['length']}'): {plane['id']} ({plane['status']}) - {int(time_left // 60)}m {int(time_left % 60)}s"
+                time_left = max(0, runway["time_available"] - cf.system_time)
+                status = f"R{runway['id']} ({runway['length']}'): {plane.id} ({plane.status}) - {time_left}m"
             else:
                 status = f"R{runway['id']} ({runway['length']}'): Available"
             runway_labels[i].config(text=status)
@@ -91,17 +165,21 @@ def update_info_labels():
     completed_label.config(text=f"Completed: {cf.completed_flights}")
     diverted_label.config(text=f"Diverted: {cf.diverted_flights}")
     emergency_label.config(text=f"Emergencies: {len(cf.emergency_flights)}")
+    if profiler.enabled and profile_label is not None:
+        profile_label.config(text="\n".join(profiler.format_report(limit=PROFILE_LINES)[:PROFILE_LINES]))
 
 def update_gui_elements():
     """Update all Treeviews and Labels."""
+    if cf.holding_table is not None:
+        cf.holding_table.sync()
     
     # Update each landing queue treeview
     for size in ["Small", "Medium", "Large"]:
         # Process landing queues
-        landing_queue_data_raw = get_priority_queue_data(cf.landing_queues[size])
+        landing_queue_data_raw = get_priority_queue_data(cf.landing_queues[size], QUEUE_ROWS)
+        landing_queue_data_raw += get_pending_data(True, size, QUEUE_ROWS - len(landing_queue_data_raw))
         seen_landing_ids = set()
         filtered_landing_data = []
-        landing_queue_data_raw.sort(key=lambda x: x["priority"], reverse=True)
         for item in landing_queue_data_raw:
             if item['id'] not in seen_landing_ids:
                 filtered_landing_data.append(item)
@@ -109,10 +187,10 @@ def update_gui_elements():
         update_treeview(landing_trees[size], filtered_landing_data)
         
         # Process takeoff queues
-        takeoff_queue_data_raw = get_priority_queue_data(cf.takeoff_queues[size])
+        takeoff_queue_data_raw = get_priority_queue_data(cf.takeoff_queues[size], QUEUE_ROWS)
+        takeoff_queue_data_raw += get_pending_data(False, size, QUEUE_ROWS - len(takeoff_queue_data_raw))
         seen_takeoff_ids = set()
         filtered_takeoff_data = []
-        takeoff_queue_data_raw.sort(key=lambda x: x["priority"], reverse=True)
         for item in takeoff_queue_data_raw:
             if item['id'] not in seen_takeoff_ids:
                 filtered_takeoff_data.append(item)
@@ -121,11 +199,36 @@ def update_gui_elements():
     
     update_info_labels()
 
+def request_redraw():
+    """Marks the display as out of date; the next frame redraws it."""
+    global needs_redraw
+    needs_redraw = True
+
+def render_frame():
+    """Redraws the GUI if anything changed since the last frame, then schedules the next frame."""
+    global needs_redraw
+    if needs_redraw:
+        needs_redraw = False
+        update_gui_elements()
+    root.after(1000 // FRAME_RATE, render_frame)
+
+def on_fast_forward():
+    """Runs the simulation ahead by the number of minutes in the fast-forward box."""
+    try:
+        minutes = int(fast_forward_entry.get())
+    except ValueError:
+        minutes = 0
+    if minutes <= 0:
+        cf.log_event("Fast-forward needs a whole number of minutes above 0", event_log.WARNING)
+        return
+    sim.fast_forward(minutes)
+
 def setup_gui():
     """Initializes the Tkinter GUI."""
     global root, log_text, start_button, stop_button
     global landing_trees, takeoff_trees
     global runway_labels, landing_label, takeoff_label, completed_label, diverted_label, emergency_label
+    global profile_label, fast_forward_entry
 
     root = tk.Tk()
     root.title("Air Traffic Control Simulation")
@@ -156,6 +259,12 @@ def setup_gui():
     emergency_button.pack(side=tk.LEFT, padx=5)
     add_flight = tk.Button(control_frame, text="Add Flight", command=sim.create_flight, width=15)
     add_flight.pack(side=tk.LEFT, padx=5)
+    fast_forward_button = tk.Button(control_frame, text="Fast-forward", command=on_fast_forward, width=12)
+    fast_forward_button.pack(side=tk.LEFT, padx=(20, 5))
+    fast_forward_entry = tk.Entry(control_frame, width=6)
+    fast_forward_entry.insert(0, "60")
+    fast_forward_entry.pack(side=tk.LEFT)
+    tk.Label(control_frame, text="minutes").pack(side=tk.LEFT, padx=2)
 
     # --- Info Area (Left Top) ---
     info_frame = tk.Frame(left_frame, padx=5, pady=5)
@@ -183,6 +292,10 @@ def setup_gui():
     diverted_label.pack(fill=tk.X, pady=1)
     emergency_label = tk.Label(queue_stats_frame, text="Emergencies: 0", anchor=tk.W, fg='red', font=('Arial', 10, 'bold'))
     emergency_label.pack(fill=tk.X, pady=1)
+    if profiler.enabled:
+        profile_label = tk.Label(queue_stats_frame, text="Profile: ...", anchor=tk.W, justify=tk.LEFT,
+                                 font=("Courier New", 8))
+        profile_label.pack(fill=tk.X, pady=1)
 
     # --- Treeview Area (Left Bottom) ---
     queue_display_frame = tk.Frame(left_frame)
@@ -219,6 +332,7 @@ def setup_gui():
     # Initialize landing and takeoff trees dictionaries
     landing_trees = {}
     takeoff_trees = {}
+    rendered_rows.clear()
     
     # Common column configurations
     
@@ -279,6 +393,7 @@ def setup_gui():
                       yscrollcommand=log_scrollbar.set, state=tk.DISABLED)
     log_text.pack(fill=tk.BOTH, expand=True)
     log_scrollbar.config(command=log_text.yview)
+    log_text.tag_configure("warning", foreground="red")
 
     # Configure tags for all treeviews
     common_tags = {
@@ -311,29 +426,7 @@ def setup_gui():
         label = tk.Label(frame, text=text, fg=label_fg)
         label.pack(side=tk.LEFT, padx=5)
     
-    # Connect log_event function to the GUI
-    # Add a special method to handle GUI log updates
-    def update_log_text(message):
-        """Updates the GUI log text widget with a new message."""
-        if log_text:
-            log_text.config(state=tk.NORMAL)
-            log_text.insert(tk.END, message + "\n")
-            log_text.config(state=tk.DISABLED)
-            log_text.yview(tk.END)
-    
-    # Monkey patch the core log_event function to update GUI
-    original_log_event = cf.log_event
-    def gui_log_event(message):
-        full_message = original_log_event(message)
-        if isinstance(full_message, str):  # If the original returns the formatted message
-            update_log_text(full_message)
-        else:  # If it doesn't return anything
-            timestamp = cf.system_time.strftime("%H:%M:%S")
-            update_log_text(f"[{timestamp}] {message}")
-        return full_message
-    
-    # Only apply the monkey patch if the original doesn't already handle GUI updates
-    if "log_text" not in cf.log_event.__code__.co_varnames:
-        cf.log_event = gui_log_event
+    refresh_log()
+    render_frame()
     
     update_info_labels()
\ No newline at end of file
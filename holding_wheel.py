@@ -0,0 +1,102 @@
+"""
+Holding-pattern deadlines on a timing wheel (optional).
+
+update_plane_state burns fuel and checks the low-fuel and diversion limits of
+every holding flight every minute. Those limits are fixed as soon as a flight
+starts holding: fuel burns at HOLDING_PATTERN_FUEL_BURN per minute and
+MAX_HOLDING_TIME does not change, so cf.holding_deadlines gives the minute at
+which each one is reached. When this module is enabled, each holding flight's
+deadlines go on a timing wheel (see timing_wheel.py) and its fuel is worked
+out from the minutes it has held, so a minute costs work only for the flights
+with a deadline in it. The flights handed back to
+simulation.update_plane_state_tracked are the ones fuel_vector would return.
+
+Like fuel_vector, fuel on the Flight records is written back lazily: code that
+reads fuel_remaining outside the simulation step calls sync_flight() or sync()
+first (through cf.holding_table). Fuel follows the clock, which assumes one
+step per minute, as in run.py and the event engine; the GUI's speed setting
+takes several minutes per step and should use the scalar loop.
+"""
+import sys
+import core_functions as cf
+import timing_wheel
+
+# --- Wheel State ---
+enabled = False
+wheel = None
+tracked = {}  # Flight -> (fuel, minute) when tracking started; also marks its wheel entries as current
+
+def enable():
+    """Start tracking holding flights by deadline."""
+    global enabled, wheel
+    if cf.holding_table is not None and cf.holding_table is not sys.modules[__name__]:
+        cf.holding_table.disable()
+    tracked.clear()
+    wheel = timing_wheel.create(cf.system_time)
+    enabled = True
+    cf.holding_table = sys.modules[__name__]
+    for plane in cf.find_flights(lambda is_arrival, status, is_emergency: status == "Holding" and not is_emergency):
+        track(plane)
+
+def disable():
+    """Write all fuel back to the flights and stop tracking them."""
+    global enabled, wheel
+    sync()
+    tracked.clear()
+    wheel = None
+    enabled = False
+    cf.holding_table = None
+
+def _fuel(start):
+    fuel, minute = start
+    return fuel - cf.HOLDING_PATTERN_FUEL_BURN * (cf.system_time - minute)
+
+def track(plane):
+    """Add a flight that has just entered the holding pattern and schedule its deadlines."""
+    if plane in tracked:
+        return
+    start = (plane.fuel_remaining, cf.system_time)
+    tracked[plane] = start
+    for deadline in cf.holding_deadlines(plane):
+        timing_wheel.add(wheel, deadline, (plane, start))
+
+def untrack(plane):
+    """Stop tracking a flight, writing its current fuel back first. Its deadlines are ignored from now on."""
+    start = tracked.pop(plane, None)
+    if start is not None:
+        plane.fuel_remaining = _fuel(start)
+
+def sync_flight(plane):
+    """Write the current fuel of one flight back to its record, if it is tracked."""
+    start = tracked.get(plane)
+    if start is not None:
+        plane.fuel_remaining = _fuel(start)
+
+def sync():
+    """Write the current fuel of every tracked flight back to its record."""
+    for plane, start in tracked.items():
+        plane.fuel_remaining = _fuel(start)
+
+def burn(minutes):
+    """Account for minutes skipped by the event engine. Fuel follows the clock, so nothing to do."""
+
+def update_holding():
+    """
+    Find the holding flights that crossed a limit at the current system time.
+
+    Only the deadlines due by now are looked at. Those flights are removed from
+    tracking with their fuel written back; the caller applies the actual state
+    changes.
+
+    Returns:
+        list: The flights that crossed a limit, in active_flights order
+    """
+    changed = []
+    for plane, start in timing_wheel.advance(wheel, cf.system_time):
+        if tracked.get(plane) is start:  # skip deadlines of flights that landed or were re-tracked
+            untrack(plane)
+            changed.append(plane)
+    if len(changed) > 1:
+        # Handle them in the order the scalar loop would reach them
+        changed.sort(key=cf.flight_numbers.__getitem__)
+    return changed
@@ -1,4 +1,6 @@
 # Max Binary Heap
+import heapq
+
 def _Item_init(k, v):
     """Lightweight composite to store priority queue items."""
     return (k,v)
@@ -29,38 +31,142 @@ def _has_right(heap, j):
 def _swap(heap, i, j):
     """Swap the elements at indices i and j of array."""
     heap[i], heap[j] = heap[j], heap[i]
+    positions = getattr(heap, "positions", None)
+    if positions is not None:
+        positions[id(heap[i][1])] = i
+        positions[id(heap[j][1])] = j
+
+# Operation counters for profiling (see profiler.py): None when off, otherwise
+# a dict that the sift loops and linear searches add their work to.
+op_counts = None
 
+# The sift loops below inline _parent/_left/_Item_gt and move a "hole" instead
+# of swapping: items on the path are shifted by one level and the sifted item is
+# written once, at its final slot. They make the same comparisons as a
+# swap-based sift, so the resulting heap is identical.
 def _upheap(heap, j):
     """Move the item at index j up to its proper position in the heap."""
-    parent = _parent(j)
-    if j > 0 and _Item_gt(heap[j], heap[parent]):
-        _swap(heap, j, parent)
-        _upheap(heap, parent)
+    start = j
+    item = heap[j]
+    key = item[0]
+    positions = getattr(heap, "positions", None)
+    while j > 0:
+        parent = (j - 1) >> 1
+        above = heap[parent]
+        if not key > above[0]:
+            break
+        heap[j] = above
+        if positions is not None:
+            positions[id(above[1])] = j
+        j = parent
+    heap[j] = item
+    if positions is not None:
+        positions[id(item[1])] = j
+    if op_counts is not None:
+        op_counts["sift_up_levels"] += (start + 1).bit_length() - (j + 1).bit_length()
 
 def _downheap(heap, j):
     """Move the item at index j down to its proper position in the heap."""
-    if _has_left(heap, j):
-        left = _left(j)
-        large_child = left
-        if _has_right(heap, j):
-            right = _right(j)
-            if _Item_gt(heap[right], heap[left]):
-                large_child = right
-        if _Item_gt(heap[large_child], heap[j]):
-            _swap(heap, j, large_child)
-            _downheap(heap, large_child)
+    start = j
+    n = len(heap)
+    item = heap[j]
+    key = item[0]
+    positions = getattr(heap, "positions", None)
+    child = 2*j + 1
+    while child < n:
+        right = child + 1
+        if right < n and heap[right][0] > heap[child][0]:
+            child = right
+        below = heap[child]
+        if not below[0] > key:
+            break
+        heap[j] = below
+        if positions is not None:
+            positions[id(below[1])] = j
+        j = child
+        child = 2*j + 1
+    heap[j] = item
+    if positions is not None:
+        positions[id(item[1])] = j
+    if op_counts is not None:
+        op_counts["sift_down_levels"] += (j + 1).bit_length() - (start + 1).bit_length()
 
 def _heapify(heap):
+    """Restore heap order over the whole list in O(n). Positions must already be filled in."""
     n = len(heap)
     start = _parent(n - 1)
     for i in range(start, -1, -1):
         _downheap(heap, i)
 
+def rekey(heap, key_fn):
+    """Recompute every key as key_fn(value) and restore heap order in O(n)."""
+    for i in range(len(heap)):
+        value = heap[i][1]
+        heap[i] = _Item_init(key_fn(value), value)
+    _heapify(heap)
+
+def _sift(heap, j):
+    """Restore heap order around index j after its key changed in either direction."""
+    if j > 0 and _Item_gt(heap[j], heap[_parent(j)]):
+        _upheap(heap, j)
+    else:
+        _downheap(heap, j)
+
+def _find(heap, value):
+    """Return the index holding value, or -1 if it is not in the heap."""
+    positions = getattr(heap, "positions", None)
+    if positions is not None:
+        return positions.get(id(value), -1)
+    if op_counts is not None:
+        op_counts["find_scans"] += 1
+    for i in range(len(heap)):
+        if heap[i][1] == value:
+            if op_counts is not None:
+                op_counts["find_scanned"] += i + 1
+            return i
+    if op_counts is not None:
+        op_counts["find_scanned"] += len(heap)
+    return -1
+
+# Indexed heap: a list that also remembers the slot of every stored value,
+# so lookups by value (remove, update_priority, contains) skip the linear scan.
+# Values are tracked by identity, so two flights that happen to share an id
+# (or compare equal) never overwrite each other's slot; lookups must pass the
+# same object that was added.
+class _IndexedHeap(list):
+    __slots__ = ("positions",)
+
+    def __init__(self):
+        super().__init__()
+        self.positions = {}
+
 # Priority Queue using max heap
 def create_heap_priority_queue():
     """Create a new empty Priority Queue (as a list)."""
     return []
 
+def create_indexed_priority_queue():
+    """Create a new empty Priority Queue that tracks the position of each value."""
+    return _IndexedHeap()
+
+def heapify_from(pairs, indexed=False):
+    """
+    Build a priority queue from (key, value) pairs in O(n).
+
+    Args:
+        pairs: Iterable of (key, value) pairs
+        indexed: Build an indexed queue (see create_indexed_priority_queue)
+
+    Returns:
+        list: The new priority queue
+    """
+    heap = create_indexed_priority_queue() if indexed else create_heap_priority_queue()
+    heap.extend(_Item_init(k, v) for k, v in pairs)
+    if indexed:
+        heap.positions.update((id(item[1]), i) for i, item in enumerate(heap))
+    _heapify(heap)
+    return heap
+
 def __len__(heap):
     """Return the number of items in the priority queue."""
     return len(heap)
@@ -68,8 +174,15 @@ def __len__(heap):
 def add(heap, key, value):
     """Add a key-value pair to the priority queue."""
     heap.append(_Item_init(key, value))
+    positions = getattr(heap, "positions", None)
+    if positions is not None:
+        positions[id(value)] = len(heap) - 1
     _upheap(heap, len(heap) - 1)
 
+def contains(heap, value):
+    """Return True if value is stored in the priority queue."""
+    return _find(heap, value) != -1
+
 def max(heap):
     """Return but do not remove (k,v) pair with maximum key."""
     if is_empty(heap):
@@ -84,44 +197,94 @@ def remove_max(heap):
     """Remove and return (k,v) pair with maximum key."""
     if is_empty(heap):
         return "Priority queue is empty."
-    _swap(heap, 0, len(heap) - 1)   # put maximum item at the end
-    item = heap.pop()               # remove it from the list
-    if not is_empty(heap):
-        _downheap(heap, 0)         # fix new root
+    return _pop_at(heap, 0)
+
+def push_many(heap, pairs):
+    """
+    Add several (key, value) pairs to the priority queue.
+
+    When the batch is at least as large as the queue, the pairs are appended
+    and the whole heap is rebuilt in O(n); otherwise they are added one by one.
+    """
+    pairs = list(pairs)
+    if len(pairs) < len(heap):
+        for k, v in pairs:
+            add(heap, k, v)
+        return
+    start = len(heap)
+    heap.extend(_Item_init(k, v) for k, v in pairs)
+    positions = getattr(heap, "positions", None)
+    if positions is not None:
+        for i in range(start, len(heap)):
+            positions[id(heap[i][1])] = i
+    _heapify(heap)
+
+def pop_many(heap, count):
+    """Remove and return up to count (k,v) pairs, highest key first."""
+    return [_pop_at(heap, 0) for _ in range(count if count < len(heap) else len(heap))]
+
+def iter_sorted(heap, k=None):
+    """
+    Yield (k,v) pairs highest key first, without copying or changing the heap.
+
+    The next item is always a child of one already yielded, so a small frontier
+    heap of candidate indices is enough: yielding k items costs O(k log k)
+    however large the heap is. Items with equal keys come out in heap order.
+    The frontier is a heapq of (-key, index) pairs, so keys must be numbers, and
+    it is not counted in op_counts. The heap must not change while the
+    iterator is in use.
+
+    Args:
+        heap: The priority queue
+        k: Stop after this many items (default: all of them)
+    """
+    n = len(heap)
+    if k is not None and k < n:
+        n = k
+    frontier = [(-heap[0][0], 0)] if n else []
+    for _ in range(n):
+        _, j = heapq.heappop(frontier)
+        yield (heap[j][0], heap[j][1])
+        for child in (2*j + 1, 2*j + 2):
+            if child < len(heap):
+                heapq.heappush(frontier, (-heap[child][0], child))
+
+def top_k(heap, k):
+    """Return the k (k,v) pairs with the highest keys, highest first, without changing the heap."""
+    return list(iter_sorted(heap, k))
+
+def _pop_at(heap, j):
+    """Remove and return the (k,v) pair at index j, keeping the heap valid."""
+    item = heap[j]
+    last = heap.pop()
+    positions = getattr(heap, "positions", None)
+    if positions is not None:
+        del positions[id(item[1])]
+    if j < len(heap):
+        heap[j] = last              # move the last item into the gap
+        if positions is not None:
+            positions[id(last[1])] = j
+        _sift(heap, j)              # and fix its position
     return (item[0], item[1])
 
 def remove(heap, value):
     """Remove the item with the specified value from the priority queue."""
     if is_empty(heap):
         return "Priority queue is empty."
-    item = None
-    for i in range(len(heap)):
-        if heap[i][1] == value:
-            last = len(heap) - 1
-            _swap(heap, i, last)
-            item = heap.pop()
-            break
-    if not is_empty(heap):
-        _heapify(heap)
-
-    if item is not None:
-        return (item[0], item[1])
-    else:
+    found_index = _find(heap, value)
+    if found_index == -1:
         return "Value not found"
+    return _pop_at(heap, found_index)
 
 def update_priority(heap, value, new_key):
     """Update priority of item with given value."""
     if is_empty(heap):
         return False
-    found_index = -1
-    for i in range(len(heap)):
-        if heap[i][1] == value:
-            found_index = i
-            break
+    found_index = _find(heap, value)
     if found_index == -1:
         return False
     old_key = heap[found_index][0]
-    heap[found_index] = _Item_init(new_key, value)
+    heap[found_index] = _Item_init(new_key, heap[found_index][1])
     if new_key > old_key:
         _upheap(heap, found_index)
     else:
@@ -204,12 +367,12 @@ def test_remove_key():
     
     # Remove the item with key 4
     print(heap)
-    result = remove(heap, 4)
+    result = remove(heap, "f")
     print(heap)
-    assert result == (4, "f"), f"Expected remove to return (4, 'c'), but got {result}"
+    assert result == (4, "f"), f"Expected remove to return (4, 'f'), but got {result}"
     
     # Check if the item is removed
-    assert remove(heap, 4) == "Key not found", "Expected error message for non-existing key."
+    assert remove(heap, "f") == "Value not found", "Expected error message for non-existing value."
 
 def test_max_empty():
     """Test that calling max on an empty priority queue returns the error message."""
@@ -217,6 +380,81 @@ def test_max_empty():
     result = max(heap)
     assert result == "Priority queue is empty.", f"Expected max() on empty queue to return error message, but got {result}"
 
+def test_indexed_heap():
+    """Test that the indexed heap keeps its position map in sync."""
+    heap = create_indexed_priority_queue()
+    planes = [{"id": f"A{i}"} for i in range(20)]
+    for i, plane in enumerate(planes):
+        add(heap, (i * 7) % 20, plane)
+    twin = {"id": "A3"}  # same id and contents as planes[3], different flight
+    add(heap, 50, twin)
+    assert contains(heap, planes[3]) and contains(heap, twin), "Both flights should be tracked."
+
+    assert update_priority(heap, planes[5], 100) is True, "update_priority should find the value."
+    assert max(heap) == (100, planes[5]), f"Expected updated flight at the top, got {max(heap)}"
+    assert remove(heap, twin) == (50, twin), "remove should take the exact flight given."
+    assert contains(heap, planes[3]) and not contains(heap, twin), "Only the removed flight should go."
+    assert remove(heap, twin) == "Value not found", "Removed flight should not be found again."
+
+    for j, (k, v) in enumerate(heap):
+        assert heap.positions[id(v)] == j, f"Position of {v['id']} out of sync."
+        if j > 0:
+            assert not _Item_gt(heap[j], heap[_parent(j)]), "Heap order violated."
+
+    keys = [remove_max(heap)[0] for _ in range(len(heap))]
+    assert keys == sorted(keys, reverse=True), f"Items not removed in order: {keys}"
+    assert heap.positions == {}, "Position map should be empty once the heap is."
+
+def test_rekey():
+    """Test recomputing all keys at once."""
+    heap = create_indexed_priority_queue()
+    for i in range(10):
+        add(heap, i, i * 3 % 10)
+    rekey(heap, lambda v: -v)
+    assert [remove_max(heap) for _ in range(3)] == [(0, 0), (-1, 1), (-2, 2)], "Keys should follow key_fn after rekey."
+    assert all(heap.positions[id(v)] == j for j, (k, v) in enumerate(heap)), "Positions out of sync after rekey."
+
+def test_bulk_operations():
+    """Test heapify_from, push_many and pop_many on plain and indexed heaps."""
+    keys = [(i * 37) % 101 for i in range(101)]
+    for indexed in (False, True):
+        heap = heapify_from(((k, f"v{k}") for k in keys[:30]), indexed)
+        push_many(heap, [(k, f"v{k}") for k in keys[30:40]])   # smaller than the heap: added one by one
+        push_many(heap, [(k, f"v{k}") for k in keys[40:]])     # larger: appended and rebuilt
+        push_many(heap, [])
+        assert len(heap) == 101, f"Expected 101 items, got {len(heap)}"
+        if indexed:
+            assert all(heap.positions[id(v)] == j for j, (k, v) in enumerate(heap)), "Positions out of sync."
+        top = pop_many(heap, 5)
+        assert top == [(k, f"v{k}") for k in (100, 99, 98, 97, 96)], f"Unexpected top items: {top}"
+        rest = pop_many(heap, 1000)
+        assert [k for k, v in rest] == list(range(95, -1, -1)), "pop_many should drain in key order."
+        assert is_empty(heap) and pop_many(heap, 3) == [], "Heap should be empty."
+
+    heap = create_indexed_priority_queue()
+    push_many(heap, [(k, k) for k in range(2000)])  # large batch into an empty heap: one O(n) build
+    assert max(heap) == (1999, 1999) and all(heap.positions[id(v)] == j for j, (k, v) in enumerate(heap))
+
+def test_iter_sorted():
+    """Test ordered iteration and top_k, which must leave the heap untouched."""
+    keys = [(i * 37) % 101 for i in range(101)] + [50, 50, 7]  # with ties
+    for indexed in (False, True):
+        heap = heapify_from(((k, f"v{i}") for i, k in enumerate(keys)), indexed)
+        before = list(heap)
+        positions = dict(heap.positions) if indexed else None
+        expected = sorted(heap, key=lambda item: item[0], reverse=True)  # stable: ties keep heap order
+        global op_counts
+        op_counts = counts = {"sift_up_levels": 0, "sift_down_levels": 0, "find_scans": 0, "find_scanned": 0}
+        assert list(iter_sorted(heap)) == expected, "iter_sorted should yield every item in key order."
+        op_counts = None
+        assert not any(counts.values()), "Listing a heap should not count as heap work."
+        assert top_k(heap, 5) == expected[:5], f"Unexpected top items: {top_k(heap, 5)}"
+        assert top_k(heap, 500) == expected and top_k(heap, 0) == [], "k past either end should be clamped."
+        assert list(heap) == before, "The heap should not change."
+        if indexed:
+            assert heap.positions == positions, "Positions should not change."
+    assert top_k(create_heap_priority_queue(), 3) == [], "An empty heap has no top items."
+
 def run_all_tests():
     test_create_heap_priority_queue()
     test_is_empty_and_len()
@@ -224,6 +462,10 @@ def run_all_tests():
     test_remove_max()
     test_remove_key()
     test_max_empty()
+    test_indexed_heap()
+    test_rekey()
+    test_bulk_operations()
+    test_iter_sorted()
     print("All tests passed!")
 
 if __name__ == '__main__':
@@ -0,0 +1,164 @@
+"""
+Per-minute metrics recorder with columnar export.
+
+When enabled, simulation.process_minute records one row per processed minute:
+queue depths per aircraft size, flights not due yet, busy runways, holding and emergency counts,
+cumulative completions and diversions, the fuel distribution of queued
+arrivals and a histogram of how long queued flights have waited past their
+scheduled time. Each column is a preallocated typed array (array.array) used
+as a ring buffer, so recording allocates nothing and, once CAPACITY rows have
+been recorded, the oldest rows are overwritten.
+
+At the end of a run the columns are exported to CSV, or to a NumPy .npz file
+(one array per column) when NumPy is installed. The event engine only
+processes minutes where something can change, so its series has gaps; the
+minute column says which minutes each row belongs to, and in between nothing
+changes except the fuel of holding flights.
+"""
+import array
+import bisect
+import csv
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import core_functions as cf
+
+CAPACITY = 1 << 16  # rows kept (about 45 days of minutes); older rows are overwritten
+FUEL_BINS = [15, 30, 60]      # fuel histogram edges, in minutes of fuel
+WAIT_BINS = [5, 15, 30, 60]   # wait histogram edges, in minutes past scheduled time
+
+def _histogram_columns(prefix, edges):
+    return [f"{prefix}_under_{edge}" for edge in edges] + [f"{prefix}_{edges[-1]}_plus"]
+
+SIZES = [plane_type["type"] for plane_type in cf.PLANE_TYPES]
+LANDING_COLUMNS = [f"landing_{size}" for size in SIZES]
+TAKEOFF_COLUMNS = [f"takeoff_{size}" for size in SIZES]
+FUEL_COLUMNS = _histogram_columns("fuel", FUEL_BINS)
+WAIT_COLUMNS = _histogram_columns("wait", WAIT_BINS)
+FLOAT_COLUMNS = ["fuel_min", "fuel_mean"]  # fuel need not be whole minutes
+COLUMNS = (["minute"] + LANDING_COLUMNS + TAKEOFF_COLUMNS
+           + ["pending", "runways_busy", "holding", "emergencies", "completed", "diverted", "fuel_min", "fuel_mean"]
+           + FUEL_COLUMNS + ["wait_max"] + WAIT_COLUMNS)
+
+# --- Recorder State ---
+enabled = False
+capacity = 0
+count = 0     # rows recorded since enable(); row i is stored at i % capacity
+columns = {}  # column name -> array
+
+def enable(size=CAPACITY):
+    """Start recording, discarding any earlier rows."""
+    global enabled, capacity, count
+    capacity = size
+    count = 0
+    columns.clear()
+    for name in COLUMNS:
+        typecode = "d" if name in FLOAT_COLUMNS else "q"
+        columns[name] = array.array(typecode, bytes(8 * size))
+    enabled = True
+
+def disable():
+    """Stop recording. The rows already recorded can still be exported."""
+    global enabled
+    enabled = False
+
+def rows():
+    """Number of rows held."""
+    return min(count, capacity)
+
+def record():
+    """Record the current simulation state as one row. Called once per processed minute."""
+    global count
+    if cf.holding_table is not None:
+        cf.holding_table.sync()
+    row = count % capacity
+    now = cf.system_time
+    columns["minute"][row] = now
+
+    bisect_right = bisect.bisect_right
+    fuel_counts = [0] * len(FUEL_COLUMNS)
+    wait_counts = [0] * len(WAIT_COLUMNS)  # flights not yet due count as under the first edge
+    holding = 0
+    arrivals = 0
+    fuel_total = 0
+    fuel_min = 0
+    wait_max = 0
+    for name, size in zip(LANDING_COLUMNS, SIZES):
+        queue = cf.landing_queues[size]
+        columns[name][row] = len(queue)
+        for _, plane in queue:
+            fuel = plane.fuel_remaining
+            if fuel < fuel_min or arrivals == 0:
+                fuel_min = fuel
+            arrivals += 1
+            fuel_total += fuel
+            fuel_counts[bisect_right(FUEL_BINS, fuel)] += 1
+            if plane.in_holding:
+                holding += 1
+            wait = now - plane.scheduled_time
+            if wait > wait_max:
+                wait_max = wait
+            wait_counts[bisect_right(WAIT_BINS, wait)] += 1
+    for name, size in zip(TAKEOFF_COLUMNS, SIZES):
+        queue = cf.takeoff_queues[size]
+        columns[name][row] = len(queue)
+        for _, plane in queue:
+            wait = now - plane.scheduled_time
+            if wait > wait_max:
+                wait_max = wait
+            wait_counts[bisect_right(WAIT_BINS, wait)] += 1
+
+    columns["pending"][row] = len(cf.pending_flights)
+    columns["runways_busy"][row] = len(cf.runways) - len(cf.free_runways)
+    columns["holding"][row] = holding
+    columns["emergencies"][row] = len(cf.emergency_flights)
+    columns["completed"][row] = cf.completed_flights
+    columns["diverted"][row] = cf.diverted_flights
+    columns["fuel_min"][row] = fuel_min
+    columns["fuel_mean"][row] = fuel_total / arrivals if arrivals else 0.0
+    for name, value in zip(FUEL_COLUMNS, fuel_counts):
+        columns[name][row] = value
+    columns["wait_max"][row] = wait_max
+    for name, value in zip(WAIT_COLUMNS, wait_counts):
+        columns[name][row] = value
+    count += 1
+
+def column(name):
+    """
+    Return one column in time order.
+
+    Args:
+        name: A name from COLUMNS
+
+    Returns:
+        array.array: The recorded values, oldest first
+    """
+    values = columns[name]
+    if count <= capacity:
+        return values[:count]
+    start = count % capacity
+    return values[start:] + values[:start]
+
+def write_csv(path):
+    """Write the recorded rows to a CSV file with a header row."""
+    ordered = [column(name) for name in COLUMNS]
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        writer.writerows(zip(*ordered))
+
+def write_npz(path):
+    """Write the recorded columns to a NumPy .npz file, one array per column. Needs NumPy."""
+    if np is None:
+        raise ImportError("Writing .npz files needs NumPy (pip install numpy)")
+    np.savez(path, **{name: np.frombuffer(column(name), dtype=np.float64 if name in FLOAT_COLUMNS else np.int64)
+                      for name in COLUMNS})
+
+def export(path):
+    """Write the recorded rows to path, as .npz if it ends in .npz and as CSV otherwise."""
+    if path.endswith(".npz"):
+        write_npz(path)
+    else:
+        write_csv(path)
@@ -0,0 +1,160 @@
+"""
+Per-phase timing and heap operation counts for finding where a run spends its time.
+
+When enabled, the phase functions in PHASES are wrapped so every call is
+counted and timed, the heap operations in HEAP_OPERATIONS are counted the same
+way, and maxheap.op_counts collects how many levels the sift loops moved items
+and how many linear searches remove/update_priority had to make. Optionally a
+cProfile capture runs at the same time for a function-level breakdown.
+
+Phases nest (process_minute contains all the others, dispatch contains
+process_landing and process_takeoff), so their times are inclusive. Nothing is
+wrapped while the profiler is off, so it costs nothing then; disable() puts the
+original functions back. Call counts and times are kept until the next enable().
+"""
+import cProfile
+import pstats
+import sys
+import time
+import event_engine
+import maxheap
+import metrics
+import schedule
+import simulation
+
+# (owner, attribute) of every timed phase, in the order they run within a minute
+PHASES = [
+    (simulation, "update_runways"),
+    (simulation, "update_plane_state"),
+    (simulation, "generate_traffic"),
+    (event_engine, "scheduled_traffic"),
+    (schedule.ScheduleFeed, "release"),
+    (simulation, "release_due_flights"),
+    (simulation, "reprioritize_emergencies"),
+    (simulation, "refresh_priorities"),
+    (simulation, "start_booked_operations"),
+    (simulation, "dispatch"),
+    (simulation, "process_landing"),
+    (simulation, "process_takeoff"),
+    (metrics, "record"),
+    (event_engine, "skip_minutes"),
+    (simulation, "process_minute"),
+]
+GUI_PHASES = ["update_gui_elements"]  # timed in gui_functions when the GUI is loaded
+HEAP_OPERATIONS = ["add", "remove_max", "remove", "update_priority", "rekey"]
+HEAP_COUNTERS = ["sift_up_levels", "sift_down_levels", "find_scans", "find_scanned"]
+
+# --- Profiler State ---
+enabled = False
+timings = {}    # phase name -> [calls, seconds]
+heap_calls = {} # heap operation -> [calls, seconds]
+heap_counts = {} # HEAP_COUNTERS, filled in by maxheap while enabled
+capture = None  # cProfile.Profile while capturing
+_originals = [] # (owner, attribute, function) replaced by enable()
+
+def _wrap(function, entry):
+    """Return a function that calls function and adds its call and time to entry."""
+    perf_counter = time.perf_counter
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            entry[0] += 1
+            entry[1] += perf_counter() - start
+    timed.__wrapped__ = function
+    return timed
+
+def _replace(owner, name, entry):
+    function = getattr(owner, name)
+    _originals.append((owner, name, function))
+    setattr(owner, name, _wrap(function, entry))
+
+def enable(with_cprofile=False):
+    """
+    Start timing the simulation phases and counting heap operations.
+
+    Args:
+        with_cprofile: Also run cProfile until disable()
+    """
+    global enabled, capture
+    if enabled:
+        disable()
+    timings.clear()
+    heap_calls.clear()
+    for owner, name in PHASES:
+        _replace(owner, name, timings.setdefault(name, [0, 0.0]))
+    gui = sys.modules.get("gui_functions")
+    if gui is not None:
+        for name in GUI_PHASES:
+            _replace(gui, name, timings.setdefault(name, [0, 0.0]))
+    for name in HEAP_OPERATIONS:
+        _replace(maxheap, name, heap_calls.setdefault(name, [0, 0.0]))
+    heap_counts.clear()
+    heap_counts.update(dict.fromkeys(HEAP_COUNTERS, 0))
+    maxheap.op_counts = heap_counts
+    capture = None
+    if with_cprofile:
+        capture = cProfile.Profile()
+        capture.enable()
+    enabled = True
+
+def disable():
+    """Stop profiling and put the original functions back. The results are kept."""
+    global enabled
+    if capture is not None:
+        capture.disable()
+    while _originals:
+        owner, name, function = _originals.pop()
+        setattr(owner, name, function)
+    maxheap.op_counts = None
+    enabled = False
+
+def report():
+    """
+    Collect the results so far.
+
+    Returns:
+        dict: "phases" maps each phase that ran to its calls, total milliseconds
+              and mean microseconds per call; "heap" holds the call count of
+              each heap operation and the HEAP_COUNTERS
+    """
+    phases = {}
+    for name, (calls, seconds) in timings.items():
+        if calls:
+            phases[name] = {"calls": calls, "total_ms": seconds * 1e3, "mean_us": seconds / calls * 1e6}
+    heap = {name: calls for name, (calls, _) in heap_calls.items()}
+    heap.update(heap_counts)
+    return {"phases": phases, "heap": heap}
+
+def format_report(results=None, limit=None):
+    """
+    Format profiling results as text lines, slowest phase first.
+
+    Args:
+        results: Output of report() (default: the current results)
+        limit: Show at most this many phases
+
+    Returns:
+        list: Lines of text
+    """
+    results = results or report()
+    phases = sorted(results["phases"].items(), key=lambda item: item[1]["total_ms"], reverse=True)
+    lines = [f"{name}: {p['total_ms']:.1f}ms / {p['calls']} calls ({p['mean_us']:.1f}us)"
+             for name, p in phases[:limit]]
+    heap = results["heap"]
+    if heap:
+        lines.append("heap: " + ", ".join(f"{name} {count}" for name, count in heap.items()))
+    return lines
+
+def write_cprofile(path):
+    """Write the cProfile capture to a file readable by pstats (and tools such as snakeviz)."""
+    if capture is None:
+        raise RuntimeError("No cProfile capture; enable the profiler with with_cprofile=True")
+    pstats.Stats(capture).dump_stats(path)
+
+def print_cprofile(limit=25, stream=None):
+    """Print the functions of the cProfile capture with the highest internal time."""
+    if capture is None:
+        raise RuntimeError("No cProfile capture; enable the profiler with with_cprofile=True")
+    pstats.Stats(capture, stream=stream or sys.stdout).sort_stats("tottime").print_stats(limit)
@@ -0,0 +1,204 @@
+"""
+Headless batch runner for the air traffic simulation.
+
+Runs the simulation with no GUI and no console logging (events can go to a log
+file with --log), then prints summary metrics. By default time advances with
+the discrete-event driver, which only processes minutes where something can
+change; --engine tick calls simulation_step once per minute instead. Both give
+the same result for the same seed. A run can start from a checkpoint (see
+checkpoint.py) and save one at the end, so a long warm-up is simulated once
+and several what-if runs fork from it; a --seed given with --resume reseeds
+traffic after loading.
+Examples:
+
+    python run.py --minutes 100000 --seed 42
+    python run.py --minutes 5000 --seed 1 --save warm.ckpt
+    python run.py --resume warm.ckpt --minutes 1000 --seed 7
+    python run.py --schedule flights.csv --minutes 1440
+    python run.py --minutes 10080 --seed 3 --engine tick --metrics week.csv
+    python run.py --minutes 20000 --seed 1 --profile --cprofile run.prof
+"""
+import argparse
+import json
+import random
+import checkpoint
+import schedule
+import core_functions as cf
+import event_engine
+import event_log
+import fuel_vector
+import holding_wheel
+import metrics
+import profiler
+import simulation
+
+def run(minutes, seed=None, engine="event", log_path=None, vectorized=False, resume_path=None, save_path=None,
+        schedule_path=None, metrics_path=None, profile=False, cprofile_path=None, wheel=False,
+        lookahead=False):
+    """
+    Run the simulation headless for a number of simulated minutes.
+
+    Args:
+        minutes: Number of simulated minutes to run
+        seed: Optional seed for the random traffic generator
+        engine: "event" for the discrete-event driver, "tick" for one step per minute
+        log_path: Optional file that receives INFO and WARNING events
+        vectorized: Update holding flights with NumPy arrays (see fuel_vector)
+        resume_path: Optional checkpoint to start from instead of an empty airport
+        save_path: Optional file to write a checkpoint to at the end of the run
+        schedule_path: Optional CSV/JSONL schedule to take traffic from instead of
+                       generating it randomly (see schedule.py)
+        metrics_path: Optional file to write per-minute metrics to, as CSV or
+                      .npz (see metrics.py)
+        profile: Time each simulation phase and count heap operations (see profiler.py)
+        cprofile_path: Optional file to write a cProfile capture of the run to
+        wheel: Check holding flights' limits by deadline on a timing wheel (see holding_wheel)
+        lookahead: Book runway slots for flights before they are due (see simulation.enable_lookahead)
+
+    Returns:
+        dict: Summary metrics for the run (see summarize); after a resume they
+              cover the checkpoint's history as well. With profiling, "profile"
+              holds profiler.report()
+    """
+    event_log.console = False
+    if log_path:
+        event_log.level = event_log.INFO
+        event_log.open_file(log_path)
+    else:
+        event_log.level = event_log.OFF
+    try:
+        if resume_path:
+            checkpoint.load(resume_path)
+        else:
+            cf.init_runways()
+        if seed is not None:
+            random.seed(seed)
+        if vectorized:
+            fuel_vector.enable()
+        elif wheel:
+            holding_wheel.enable()
+        if lookahead and cf.runway_bookings is None:
+            simulation.enable_lookahead()
+        if schedule_path:
+            # After a resume, carry on from the first flight the checkpoint's feed had not released
+            schedule.open_feed(schedule_path, skip=checkpoint.schedule_rows if resume_path else 0)
+        if metrics_path:
+            metrics.enable()
+        if profile or cprofile_path:
+            profiler.enable(with_cprofile=bool(cprofile_path))
+
+        if engine == "event":
+            if not (resume_path and event_engine.started):
+                event_engine.reset()  # otherwise carry on with the checkpoint's pending events
+            processed = event_engine.run(minutes)
+        else:
+            step = simulation.simulation_step
+            for _ in range(minutes):
+                step()
+            processed = minutes
+        if profiler.enabled:
+            profiler.disable()
+            if cprofile_path:
+                profiler.write_cprofile(cprofile_path)
+        if metrics_path:
+            metrics.disable()
+            metrics.export(metrics_path)
+        if save_path:
+            checkpoint.save(save_path)
+        simulation.traffic_feed = None
+        if cf.holding_table is not None:
+            cf.holding_table.disable()
+        if cf.runway_bookings is not None:
+            simulation.disable_lookahead()
+    finally:
+        event_log.close_file()  # also flushes the records still batched if the run fails
+
+    summary = summarize(cf.system_time)  # the clock starts at 0, so this covers the whole history
+    summary["processed_minutes"] = processed
+    if profile or cprofile_path:
+        summary["profile"] = profiler.report()
+    return summary
+
+def summarize(elapsed_minutes):
+    """
+    Collect summary metrics from the current simulation state.
+
+    Args:
+        elapsed_minutes: Simulated minutes covered by the run
+
+    Returns:
+        dict: Flight counts, holding time statistics and runway utilization
+    """
+    runway_utilization = {}
+    for runway in cf.runways:
+        busy = runway["busy_minutes"]
+        if runway["is_occupied"]:
+            # Do not count the part of the current operation past the end of the run
+            busy -= max(0, runway["time_available"] - cf.system_time)
+        runway_utilization[runway["id"]] = busy / elapsed_minutes if elapsed_minutes else 0.0
+
+    holding = cf.holding_times
+    return {
+        "minutes": elapsed_minutes,
+        "completed": cf.completed_flights,
+        "diverted": cf.diverted_flights,
+        "active": len(cf.active_flights),
+        "landing_queue": {size: len(q) for size, q in cf.landing_queues.items()},
+        "takeoff_queue": {size: len(q) for size, q in cf.takeoff_queues.items()},
+        "pending": len(cf.pending_flights),
+        "holding_flights": len(holding),
+        "holding_mean": sum(holding) / len(holding) if holding else 0.0,
+        "holding_max": max(holding) if holding else 0.0,
+        "runway_utilization": runway_utilization,
+        "mean_runway_utilization": sum(runway_utilization.values()) / len(runway_utilization) if runway_utilization else 0.0,
+    }
+
+def print_summary(summary):
+    """Print summary metrics in a readable form."""
+    print(f"Simulated minutes: {summary['minutes']:.0f} ({summary['processed_minutes']} processed)")
+    print(f"Completed: {summary['completed']}  Diverted: {summary['diverted']}  Still active: {summary['active']}")
+    print(f"Landing queue at end: {summary['landing_queue']}")
+    print(f"Takeoff queue at end: {summary['takeoff_queue']}  Not due yet: {summary['pending']}")
+    print(f"Holding: {summary['holding_flights']} flights, mean {summary['holding_mean']:.1f}m, max {summary['holding_max']:.1f}m")
+    print(f"Runway utilization: {summary['mean_runway_utilization']:.1%} mean")
+    for runway_id, utilization in summary["runway_utilization"].items():
+        print(f"  R{runway_id}: {utilization:.1%}")
+    if "profile" in summary:
+        print("Profile (inclusive times, slowest first):")
+        for line in profiler.format_report(summary["profile"]):
+            print(f"  {line}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the air traffic simulation without the GUI.")
+    parser.add_argument("--minutes", type=int, default=1440, help="simulated minutes to run (default: one day)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random traffic generator")
+    parser.add_argument("--engine", choices=["event", "tick"], default="event",
+                        help="advance time event by event (default) or one minute per step")
+    holding = parser.add_mutually_exclusive_group()
+    holding.add_argument("--vectorized", action="store_true",
+                         help="update holding flights with NumPy arrays (needs numpy)")
+    holding.add_argument("--wheel", action="store_true",
+                         help="check holding flights only at their fuel and holding deadlines (timing wheel)")
+    parser.add_argument("--lookahead", action="store_true",
+                        help="book runway slots for flights as soon as they are announced")
+    parser.add_argument("--log", metavar="PATH", help="write flight events to this file")
+    parser.add_argument("--schedule", metavar="PATH", help="take traffic from this CSV/JSONL schedule")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write per-minute metrics to this file (CSV, or NumPy .npz if it ends in .npz)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each simulation phase and count heap operations")
+    parser.add_argument("--cprofile", metavar="PATH", help="also write a cProfile capture to this file")
+    parser.add_argument("--resume", metavar="PATH", help="start from this checkpoint instead of an empty airport")
+    parser.add_argument("--save", metavar="PATH", help="write a checkpoint to this file at the end of the run")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    summary = run(args.minutes, args.seed, args.engine, args.log, args.vectorized, args.resume, args.save, args.schedule,
+                  args.metrics, args.profile, args.cprofile, args.wheel, args.lookahead)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+if __name__ == "__main__":
+    main()
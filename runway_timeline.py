@@ -0,0 +1,188 @@
+"""
+Runway reservation timeline.
+
+Holds the future reservations of each runway as half-open [start, end)
+minute intervals that never overlap, kept in a list sorted by start with a
+parallel list of starts for bisect. Each owner (a flight) holds at most one
+reservation, which can be looked up and cancelled by owner.
+
+Finding the reservations that overlap an interval, or the earliest free slot
+of a given length from some minute on, is a binary search followed by a walk
+over the reservations that actually stand in the way; with reservations only
+a few operations ahead of the clock that walk is short.
+"""
+import bisect
+
+def create(runway_ids):
+    """
+    Create an empty timeline.
+
+    Args:
+        runway_ids: Ids of the runways to keep reservations for
+
+    Returns:
+        dict: The timeline
+    """
+    return {"runways": {runway_id: {"starts": [], "slots": []} for runway_id in runway_ids},
+            "owners": {}}
+
+def reserve(timeline, runway_id, start, end, owner):
+    """Reserve [start, end) on a runway for owner, replacing any reservation owner already holds. The interval must be free."""
+    cancel(timeline, owner)
+    runway = timeline["runways"][runway_id]
+    i = bisect.bisect_left(runway["starts"], start)
+    runway["starts"].insert(i, start)
+    runway["slots"].insert(i, (start, end, owner))
+    timeline["owners"][owner] = (runway_id, start, end)
+
+def cancel(timeline, owner):
+    """
+    Drop the reservation held by owner, if any.
+
+    Returns:
+        tuple: (runway_id, start, end) of the dropped reservation, or None
+    """
+    found = timeline["owners"].pop(owner, None)
+    if found is not None:
+        runway_id, start, _ = found
+        runway = timeline["runways"][runway_id]
+        i = bisect.bisect_left(runway["starts"], start)
+        del runway["starts"][i]
+        del runway["slots"][i]
+    return found
+
+def reservation(timeline, owner):
+    """Return (runway_id, start, end) of the reservation held by owner, or None."""
+    return timeline["owners"].get(owner)
+
+def conflicts(timeline, runway_id, start, end, ignore=None):
+    """
+    Find the reservations on a runway that overlap [start, end).
+
+    Args:
+        timeline: The timeline
+        runway_id: Runway to look at
+        start, end: The interval, in minutes
+        ignore: Owner whose own reservation does not count
+
+    Returns:
+        list: Owners of the overlapping reservations, earliest first
+    """
+    runway = timeline["runways"][runway_id]
+    slots = runway["slots"]
+    i = bisect.bisect_left(runway["starts"], start)
+    if i > 0 and slots[i - 1][1] > start:
+        i -= 1  # only the reservation just before start can reach into the interval
+    found = []
+    while i < len(slots) and slots[i][0] < end:
+        if slots[i][2] is not ignore:
+            found.append(slots[i][2])
+        i += 1
+    return found
+
+def earliest_start(timeline, runway_id, not_before, duration):
+    """Return the earliest minute >= not_before from which a runway is free for duration minutes."""
+    runway = timeline["runways"][runway_id]
+    slots = runway["slots"]
+    start = not_before
+    i = bisect.bisect_left(runway["starts"], start)
+    if i > 0 and slots[i - 1][1] > start:
+        start = slots[i - 1][1]
+    while i < len(slots) and slots[i][0] < start + duration:
+        if slots[i][1] > start:
+            start = slots[i][1]
+        i += 1
+    return start
+
+def earliest_slot(timeline, candidates, duration):
+    """
+    Find the earliest free slot of a given length over several runways.
+
+    Args:
+        timeline: The timeline
+        candidates: (runway_id, not_before) pairs, most preferred runway first
+        duration: Length of the slot, in minutes
+
+    Returns:
+        tuple: (start, runway_id) of the earliest slot, the most preferred runway
+               on ties, or None if there are no candidates
+    """
+    best = None
+    for runway_id, not_before in candidates:
+        start = earliest_start(timeline, runway_id, not_before, duration)
+        if best is None or start < best[0]:
+            best = (start, runway_id)
+    return best
+
+def due(timeline, now):
+    """Return (runway_id, start, end, owner) of every reservation starting by now, earliest first."""
+    found = []
+    for runway_id, runway in timeline["runways"].items():
+        for start, end, owner in runway["slots"]:
+            if start > now:
+                break
+            found.append((runway_id, start, end, owner))
+    found.sort(key=lambda slot: slot[1])
+    return found
+
+def reservations(timeline):
+    """Return (runway_id, start, end, owner) of every reservation."""
+    return [(runway_id, start, end, owner) for runway_id, runway in timeline["runways"].items()
+            for start, end, owner in runway["slots"]]
+
+# Testing
+
+def test_runway_timeline():
+    """Test the timeline against a minute-by-minute occupancy map."""
+    import random
+    rng = random.Random(11)
+    runway_ids = [1, 2, 3]
+    timeline = create(runway_ids)
+    taken = {runway_id: {} for runway_id in runway_ids}  # runway -> minute -> owner
+    for owner in range(600):
+        if owner % 5 == 4:
+            victim = rng.randrange(owner)
+            held = any(victim in slots.values() for slots in taken.values())
+            assert (cancel(timeline, victim) is not None) == held, "cancel should report whether a reservation was held."
+            for slots in taken.values():
+                for minute in [m for m, o in slots.items() if o == victim]:
+                    del slots[minute]
+            assert reservation(timeline, victim) is None, "A cancelled reservation should be gone."
+            continue
+        duration = rng.randint(1, 20)
+        candidates = [(runway_id, rng.randrange(0, 400)) for runway_id in runway_ids[rng.randrange(3):]]
+        start, runway_id = earliest_slot(timeline, candidates, duration)
+        # Brute force: the first free stretch on each candidate, preferring earlier candidates on ties
+        expected = None
+        for candidate, not_before in candidates:
+            first = not_before
+            while any(m in taken[candidate] for m in range(first, first + duration)):
+                first += 1
+            if expected is None or first < expected[0]:
+                expected = (first, candidate)
+        assert (start, runway_id) == expected, f"Expected slot {expected}, got {(start, runway_id)}"
+        assert conflicts(timeline, runway_id, start, start + duration) == [], "The slot found should be free."
+        reserve(timeline, runway_id, start, start + duration, owner)
+        for minute in range(start, start + duration):
+            taken[runway_id][minute] = owner
+        assert reservation(timeline, owner) == (runway_id, start, start + duration), "Reservation not recorded."
+
+        probe = rng.randrange(0, 450)
+        length = rng.randint(1, 15)
+        overlapping = sorted({taken[runway_id][m] for m in range(probe, probe + length) if m in taken[runway_id]},
+                             key=lambda o: reservation(timeline, o)[1])
+        assert conflicts(timeline, runway_id, probe, probe + length) == overlapping, "Wrong overlapping reservations."
+        if overlapping:
+            assert conflicts(timeline, runway_id, probe, probe + length, ignore=overlapping[0]) == overlapping[1:], \
+                "The ignored owner should not count."
+
+    now = 200
+    expected = sorted((slot for slot in reservations(timeline) if slot[1] <= now), key=lambda slot: slot[1])
+    assert [s[1] for s in due(timeline, now)] == [s[1] for s in expected], "due should list the reservations started by now."
+
+def run_all_tests():
+    test_runway_timeline()
+    print("All tests passed!")
+
+if __name__ == '__main__':
+    run_all_tests()
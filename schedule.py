@@ -0,0 +1,144 @@
+"""
+Trace-driven traffic: stream flights from a schedule file into the simulation.
+
+A schedule is a CSV file with a header row, or a JSONL file with one JSON
+object per line, listing flights in order of scheduled time:
+
+    id,operation,type,scheduled_time,fuel,vip,medevac,tight_connection,emergency
+    BA117,arrival,Large,2024-05-01T06:05,90,0,0,1,0
+    DL42,departure,Medium,2024-05-01T06:07,,0,0,0,0
+
+id, operation (arrival/departure), type (a PLANE_TYPES name) and
+scheduled_time are required. scheduled_time is either a whole number of
+simulation minutes or an ISO date and time; with dates, the first row's time
+becomes minute 0 unless a start is given, and the simulation clock's display
+origin is set to it. The other columns are optional.
+
+Rows are parsed lazily, one at a time, so memory use does not depend on the
+size of the file and a run starts as soon as the first row is read. A
+ScheduleFeed set as simulation.traffic_feed adds each flight to its queue
+RELEASE_LEAD minutes before it is due, like generate_traffic does with the
+flights it schedules up to five minutes ahead. Checkpoints record how many
+flights the feed has released, so a resumed run can open the same file again
+and carry on from the next row (the skip argument of open_feed).
+"""
+import csv
+import itertools
+import json
+from datetime import datetime
+import core_functions as cf
+import simulation
+
+RELEASE_LEAD = 5  # minutes before its scheduled time that a flight joins its queue
+DEFAULT_FUEL = {"arrival": 75, "departure": 120}  # when the fuel column is empty
+OPERATIONS = {"arrival": True, "a": True, "departure": False, "d": False}
+PLANE_TYPES = {plane_type["type"].lower(): plane_type for plane_type in cf.PLANE_TYPES}
+
+def _rows(path):
+    """Yield (line number, row dict) from a CSV or JSONL file, one row at a time."""
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line_number, line in enumerate(file, start=1):
+                if line.strip():
+                    yield line_number, json.loads(line)
+        else:
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+def read_schedule(path, start=None):
+    """
+    Lazily read flights from a schedule file.
+
+    Args:
+        path: CSV file, or JSONL file (.jsonl / .ndjson)
+        start: Datetime of simulation minute 0, for files with dated times.
+               Defaults to the first row's time.
+
+    Yields:
+        Flight: One record per row, in file order
+
+    Raises:
+        ValueError: On a malformed row or a row scheduled before the one above it
+    """
+    previous = None
+    for line_number, row in _rows(path):
+        try:
+            operation = str(row["operation"]).strip().lower()
+            is_arrival = OPERATIONS[operation]
+            plane_type = PLANE_TYPES[str(row["type"]).strip().lower()]
+            when = row["scheduled_time"]
+            if isinstance(when, str) and not when.strip().lstrip("-").isdigit():
+                when = datetime.fromisoformat(when.strip())
+                if start is None:
+                    start = when.replace(second=0, microsecond=0)
+                    cf.clock_origin = start
+                minute = int((when - start).total_seconds() // 60)
+            else:
+                minute = int(when)
+            fuel = row.get("fuel")
+            fuel = int(fuel) if fuel not in (None, "") else DEFAULT_FUEL["arrival" if is_arrival else "departure"]
+            flight_id = str(row["id"]).strip()
+        except (KeyError, ValueError, TypeError) as error:
+            raise ValueError(f"{path}, line {line_number}: bad schedule row ({error!r})") from None
+        if previous is not None and minute < previous:
+            raise ValueError(f"{path}, line {line_number}: schedule is not in order of scheduled time")
+        previous = minute
+        yield cf.Flight(
+            id=flight_id, type=plane_type["type"], size=plane_type["size"],
+            min_runway=plane_type["min_runway"], operation_time=plane_type["operation_time"],
+            fuel_remaining=fuel, scheduled_time=minute,
+            is_vip=_flag(row.get("vip")), is_medevac=_flag(row.get("medevac")),
+            has_tight_connection=_flag(row.get("tight_connection")),
+            is_emergency=_flag(row.get("emergency")), is_arrival=is_arrival
+        )
+
+class ScheduleFeed:
+    """
+    Releases flights from a schedule into the simulation as they come due.
+
+    Only the next flight is held in memory. Set an instance as
+    simulation.traffic_feed; simulation_step and the event engine then call
+    release() instead of generating random traffic.
+    """
+
+    def __init__(self, flights, lead=RELEASE_LEAD, skip=0):
+        """
+        Args:
+            flights: Iterable of Flight records in order of scheduled time
+                     (such as read_schedule(path))
+            lead: Minutes before its scheduled time that each flight is released
+            skip: Number of flights already released by an earlier run (when
+                  resuming from a checkpoint); they are read and dropped
+        """
+        self.flights = itertools.islice(flights, skip, None)
+        self.lead = lead
+        self.upcoming = next(self.flights, None)
+        self.released = skip
+
+    def next_release(self):
+        """Minute at which the next flight is released, or None when the schedule is done."""
+        if self.upcoming is None:
+            return None
+        return self.upcoming.scheduled_time - self.lead
+
+    def release(self):
+        """Add every flight due for release by the current system time to its queue."""
+        while self.upcoming is not None and self.upcoming.scheduled_time - self.lead <= cf.system_time:
+            plane = self.upcoming
+            if plane.is_arrival:
+                simulation.add_landing(plane)
+            else:
+                simulation.add_takeoff(plane)
+            self.released += 1
+            self.upcoming = next(self.flights, None)
+
+def open_feed(path, start=None, lead=RELEASE_LEAD, skip=0):
+    """Start feeding the simulation from a schedule file, after its first skip flights. Returns the ScheduleFeed."""
+    simulation.traffic_feed = ScheduleFeed(read_schedule(path, start), lead, skip)
+    return simulation.traffic_feed
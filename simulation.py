@@ -0,0 +1,650 @@
+import bisect
+import heapq
+import random
+import core_functions as cf
+import event_log
+import metrics
+import runway_timeline
+import tournament
+
+# Optional schedule feed (see schedule.py). When set, new flights come from it
+# instead of generate_traffic.
+traffic_feed = None
+
+# Optional callback used by event-driven drivers (see event_engine.py). It is
+# called with a future system time at which some flight or runway may change
+# state, so the driver knows it cannot skip past that minute.
+wakeup_hook = None
+
+def _wakeup(when):
+    """Report a future time at which the simulation state may change."""
+    if wakeup_hook is not None:
+        wakeup_hook(when)
+
+def add_landing(plane):
+    """
+    Add an arrival plane to its appropriate landing queue based on size.
+
+    A plane that is not due yet waits in pending_flights and joins its queue
+    at its scheduled time (see release_due_flights).
+    
+    Args:
+        plane: Flight record for the plane
+    """
+    plane.id = cf.unique_flight_id(plane.id)
+    cf.register_flight(plane)
+    if plane.scheduled_time > cf.system_time:
+        cf.maxheap.add(cf.pending_flights, -plane.scheduled_time, plane)
+        cf.log_event(f"Flight {plane.id} ({plane.type}) expected for landing at {cf.clock_time(plane.scheduled_time).strftime('%H:%M')}")
+    else:
+        enqueue_landing(plane)
+    if cf.runway_bookings is not None:
+        book_flight(plane)
+    _wakeup(plane.scheduled_time)
+    _wakeup(plane.scheduled_time + 1)  # first minute it can start holding
+
+def add_takeoff(plane):
+    """
+    Add a departure plane to its appropriate takeoff queue based on size.
+
+    A plane that is not due yet waits in pending_flights and joins its queue
+    at its scheduled time (see release_due_flights).
+    
+    Args:
+        plane: Flight record for the plane
+    """
+    plane.id = cf.unique_flight_id(plane.id)
+    cf.register_flight(plane)
+    cf.set_status(plane, "In Takeoff Queue")
+    if plane.scheduled_time > cf.system_time:
+        cf.maxheap.add(cf.pending_flights, -plane.scheduled_time, plane)
+        cf.log_event(f"Flight {plane.id} ({plane.type}) expected for takeoff at {cf.clock_time(plane.scheduled_time).strftime('%H:%M')}")
+    else:
+        enqueue_takeoff(plane)
+    if cf.runway_bookings is not None:
+        book_flight(plane)
+    _wakeup(plane.scheduled_time)
+
+def enqueue_landing(plane):
+    """Put an arrival that is due into its landing queue."""
+    priority = cf.calculate_landing_priority(plane)
+    size = plane.type
+    if cf.maxheap.is_empty(cf.landing_queues[size]):
+        cf.priority_epochs["landing"][size] = cf.priority_epoch_of(cf.system_time)
+    cf.maxheap.add(cf.landing_queues[size], priority, plane)
+    cf.queue_changed(cf.landing_board, size)
+    cf.log_event(f"Flight {plane.id} ({size}) added to landing queue (Priority: {priority:.1f}) Scheduled at {cf.clock_time(plane.scheduled_time)} ")
+
+def enqueue_takeoff(plane):
+    """Put a departure that is due into its takeoff queue."""
+    priority = cf.calculate_takeoff_priority(plane)
+    size = plane.type
+    if cf.maxheap.is_empty(cf.takeoff_queues[size]):
+        cf.priority_epochs["takeoff"][size] = cf.priority_epoch_of(cf.system_time)
+    cf.maxheap.add(cf.takeoff_queues[size], priority, plane)
+    cf.queue_changed(cf.takeoff_board, size)
+    cf.log_event(f"Flight {plane.id} ({size}) added to takeoff queue (Priority: {priority:.1f})")
+
+def enable_lookahead():
+    """
+    Turn on lookahead booking.
+
+    Each flight reserves the earliest slot from its scheduled time on a runway
+    long enough for it as soon as it is added (book_flight), arrivals and
+    departures alike, and starts its landing or takeoff there at the start of
+    the slot (start_booked_operations) even if other flights in its queue rank
+    higher. A flight can still take a free runway earlier if its operation
+    ends before the next reservation on it. Emergencies ignore reservations and
+    move the ones they run into. Since every flight holds a slot, a stream of
+    arrival reservations cannot shut departures out.
+    """
+    cf.reset_bookings()
+    for _, plane in cf.maxheap.iter_sorted(cf.pending_flights):
+        book_flight(plane)
+    for queues in (cf.landing_queues, cf.takeoff_queues):
+        for size in reversed(cf.QUEUE_ORDER):
+            for _, plane in cf.maxheap.iter_sorted(queues[size]):
+                book_flight(plane)
+
+def disable_lookahead():
+    """Turn off lookahead booking and drop all reservations."""
+    cf.runway_bookings = None
+
+def book_flight(plane):
+    """Reserve the earliest runway slot a flight can use from its scheduled time, but not before the next minute."""
+    not_before = max(plane.scheduled_time, cf.system_time + 1)
+    i = bisect.bisect_left(cf.runways_by_length, (plane.min_runway,))  # the shortest runway long enough
+    candidates = [(runway["id"], max(not_before, runway["time_available"]) if runway["is_occupied"] else not_before)
+                  for _, _, runway in cf.runways_by_length[i:]]
+    start, runway_id = runway_timeline.earliest_slot(cf.runway_bookings, candidates, plane.operation_time)
+    runway_timeline.reserve(cf.runway_bookings, runway_id, start, start + plane.operation_time, plane)
+    _wakeup(start)
+    cf.log_event(f"Flight {plane.id} booked on Runway {runway_id} at {cf.clock_time(start).strftime('%H:%M')}", event_log.DEBUG)
+
+def settle_bookings(runway, plane):
+    """
+    Update the reservations after a plane was given a runway.
+
+    The plane's own reservation is no longer needed. Reservations its operation
+    runs into (only possible for emergencies) are moved to a new slot.
+    """
+    runway_timeline.cancel(cf.runway_bookings, plane)
+    for other in runway_timeline.conflicts(cf.runway_bookings, runway["id"], cf.system_time, runway["time_available"]):
+        book_flight(other)
+
+def start_booked_operations():
+    """
+    Start the landings and takeoffs whose reserved slot begins at the current system time.
+
+    Returns:
+        int: Number of operations started
+    """
+    started = 0
+    for runway_id, start, end, plane in runway_timeline.due(cf.runway_bookings, cf.system_time):
+        if runway_timeline.reservation(cf.runway_bookings, plane) != (runway_id, start, end):
+            continue  # moved by an emergency landing earlier in this pass
+        runway = next(runway for runway in cf.runways if runway["id"] == runway_id)
+        queue = (cf.landing_queues if plane.is_arrival else cf.takeoff_queues)[plane.type]
+        if runway["is_occupied"] or not cf.maxheap.contains(queue, plane):
+            # Cannot be used as booked; try again from the next minute
+            runway_timeline.cancel(cf.runway_bookings, plane)
+            if cf.active_flights.get(plane.id) is plane:
+                book_flight(plane)
+            continue
+        cf.maxheap.remove(queue, plane)
+        if plane.is_arrival:
+            cf.queue_changed(cf.landing_board, plane.type)
+            start_landing(runway, plane)
+        else:
+            cf.queue_changed(cf.takeoff_board, plane.type)
+            start_takeoff(runway, plane)
+        started += 1
+    return started
+
+def release_due_flights():
+    """
+    Move the flights whose scheduled time has come from pending_flights into their queues.
+
+    Each flight is popped from the pending heap once, in O(log n), so a flight
+    that is not due yet never sits at the head of a priority queue blocking the
+    ready flights under it.
+    """
+    pending = cf.pending_flights
+    while pending and -pending[0][0] <= cf.system_time:
+        _, plane = cf.maxheap.remove_max(pending)
+        if cf.active_flights.get(plane.id) is not plane:
+            continue
+        if plane.is_arrival:
+            enqueue_landing(plane)
+        else:
+            enqueue_takeoff(plane)
+
+def update_runways():
+    """
+    Check all runways and free them if their current operation is complete.
+    """
+    for runway in cf.runways:
+        if runway["is_occupied"] and cf.system_time >= runway["time_available"]:
+            plane = runway["current_plane"]
+            cf.log_event(f"Runway {runway['id']} available ({plane.id} {plane.status} complete)")
+            cf.release_runway(runway)
+            cf.set_status(plane, "Completed")
+            cf.completed_flights += 1
+            cf.unregister_flight(plane.id)
+
+def suitable_runways_occupied(plane):
+    """Return True if every runway long enough for the plane's size class is occupied."""
+    return cf.free_runway_counts[plane.type] == 0
+
+def _needs_update(is_arrival, status, is_emergency):
+    """Index keys of the flights update_plane_state has work for: arrivals and emergencies not yet landing."""
+    return status != "Landing" and (is_arrival or is_emergency)
+
+def _needs_update_tracked(is_arrival, status, is_emergency):
+    """Like _needs_update, leaving out the holding flights the holding table looks after (all but emergencies)."""
+    return status != "Landing" and (is_arrival or is_emergency) and (status != "Holding" or is_emergency)
+
+def update_plane_state():
+    """
+    Update status of all active flights, handling fuel consumption, emergencies, and diversions.
+
+    Departures only matter here once they are emergencies, so only arrivals and
+    emergencies are visited (see cf.find_flights).
+    """
+    if cf.holding_table is not None:
+        return update_plane_state_tracked()
+
+    planes_to_remove = []
+
+    for plane in cf.find_flights(_needs_update):
+        plane_id = plane.id
+
+        if plane.status == "Holding":
+            plane.fuel_remaining -= cf.HOLDING_PATTERN_FUEL_BURN
+            check_holding(plane_id, plane, planes_to_remove)
+
+        # Place arriving planes in holding pattern if all suitable runways are occupied
+        elif plane.is_arrival and plane.scheduled_time < cf.system_time and suitable_runways_occupied(plane):
+            enter_holding(plane)
+
+        # Update priority for emergency flights
+        if plane.is_emergency:
+            update_emergency_priority(plane_id, plane)
+
+    remove_diverted(planes_to_remove)
+
+def update_plane_state_tracked():
+    """
+    Same as update_plane_state, with the holding pattern handled by cf.holding_table.
+
+    The table applies the fuel burn, the low-fuel threshold and the diversion
+    limits to all holding flights at once (fuel_vector in NumPy arrays,
+    holding_wheel by deadline); only the flights that crossed a limit are
+    handled here, merged into the other flights in the order the scalar loop
+    would use. The other holding flights are not visited at all.
+    """
+    planes_to_remove = []
+    crossed = cf.holding_table.update_holding()
+    flights = cf.find_flights(_needs_update_tracked)
+    if crossed:
+        # Visit them where the scalar loop would, so emergency ties in the queues break the same way
+        flights = heapq.merge(flights, crossed, key=cf.flight_numbers.__getitem__)
+        crossed = set(crossed)
+
+    for plane in flights:
+        plane_id = plane.id
+        if plane in crossed:
+            check_holding(plane_id, plane, planes_to_remove)  # the table already burned its fuel
+        elif plane.status == "Holding":
+            # Emergencies are not tracked by the table
+            plane.fuel_remaining -= cf.HOLDING_PATTERN_FUEL_BURN
+            check_holding(plane_id, plane, planes_to_remove)
+        elif plane.is_arrival and plane.scheduled_time < cf.system_time and suitable_runways_occupied(plane):
+            enter_holding(plane)
+        if plane.is_emergency:
+            update_emergency_priority(plane_id, plane)
+
+    remove_diverted(planes_to_remove)
+
+def check_holding(plane_id, plane, planes_to_remove):
+    """
+    Apply the low-fuel and diversion rules to a holding plane after its fuel burn.
+
+    Args:
+        plane_id: Key of the plane in active_flights
+        plane: The holding plane
+        planes_to_remove: List that diverted plane ids are appended to
+    """
+    # Detect low fuel emergency condition
+    if plane.fuel_remaining <= cf.FUEL_EMERGENCY_THRESHOLD and not plane.is_emergency:
+        cf.set_status(plane, "Emergency (Low Fuel)", emergency=True)
+        cf.emergency_flights[plane] = None
+        cf.log_event(f"EMERGENCY (Low Fuel): Flight {plane.id} fuel {plane.fuel_remaining} min while holding. Priority set to 10000.", event_log.WARNING)
+
+    # Handle diversion for planes in holding pattern too long
+    if plane.in_holding:
+         holding_time = cf.system_time - plane.holding_since
+         if holding_time > cf.MAX_HOLDING_TIME or plane.fuel_remaining < 5:
+             cf.set_status(plane, "Diverted")
+             reason = "Max holding time" if holding_time > cf.MAX_HOLDING_TIME else "Critical fuel"
+             cf.log_event(f"Flight {plane.id} DIVERTED ({reason}). Fuel: {plane.fuel_remaining}, Held: {int(holding_time)}m", event_log.WARNING)
+             cf.diverted_flights += 1
+             cf.holding_times.append(holding_time)
+             planes_to_remove.append(plane_id)
+             cf.emergency_flights.pop(plane, None)
+
+def enter_holding(plane):
+    """Put an arriving plane into the holding pattern at the current system time."""
+    cf.set_status(plane, 'Holding')
+    plane.in_holding = True
+    plane.holding_since = cf.system_time
+    if cf.holding_table is not None and not plane.is_emergency:
+        cf.holding_table.track(plane)
+    if wakeup_hook is not None:
+        for deadline in cf.holding_deadlines(plane):
+            wakeup_hook(deadline)
+    cf.log_event(f"Flight {plane.id} ({plane.type}) entering holding. Fuel: {plane.fuel_remaining}")
+
+def update_emergency_priority(plane_id, plane):
+    """Move an emergency flight to the top priority in its queue."""
+    if plane.is_arrival:
+        cf.maxheap.update_priority(cf.landing_queues[plane.type], plane, cf.EMERGENCY_PRIORITY)
+        cf.queue_changed(cf.landing_board, plane.type)
+    else:
+        cf.maxheap.update_priority(cf.takeoff_queues[plane.type], plane, cf.EMERGENCY_PRIORITY)
+        cf.queue_changed(cf.takeoff_board, plane.type)
+
+def remove_diverted(planes_to_remove):
+    """Remove diverted planes from active flights and the landing queues."""
+    for plane_id in planes_to_remove:
+        if plane_id in cf.active_flights:
+            size = cf.active_flights[plane_id].type
+            if cf.active_flights[plane_id].is_arrival:
+                cf.maxheap.remove(cf.landing_queues[size], cf.active_flights[plane_id])
+                cf.queue_changed(cf.landing_board, size)
+            if cf.runway_bookings is not None:
+                runway_timeline.cancel(cf.runway_bookings, cf.active_flights[plane_id])
+            cf.unregister_flight(plane_id)
+
+def current_priority(plane):
+    """Priority of a queued flight at the current system time."""
+    if cf.holding_table is not None:
+        cf.holding_table.sync_flight(plane)
+    if plane.is_emergency:
+        return cf.EMERGENCY_PRIORITY
+    if plane.is_arrival:
+        return cf.calculate_landing_priority(plane)
+    return cf.calculate_takeoff_priority(plane)
+
+def refresh_priorities():
+    """
+    Recompute the priorities in every queue once per PRIORITY_EPOCH minutes.
+
+    Priorities depend on the clock and on fuel, so the keys set at enqueue time
+    drift. Rather than re-keying every flight every minute, each queue is
+    rebuilt in O(n) when a new epoch starts, and settle_head catches any drift
+    at the head in between.
+    """
+    epoch = cf.priority_epoch_of(cf.system_time)
+    for direction, queues, board in (("landing", cf.landing_queues, cf.landing_board),
+                                     ("takeoff", cf.takeoff_queues, cf.takeoff_board)):
+        for size, queue in queues.items():
+            if not cf.maxheap.is_empty(queue) and cf.priority_epochs[direction][size] != epoch:
+                cf.maxheap.rekey(queue, current_priority)
+                cf.queue_changed(board, size)
+                cf.priority_epochs[direction][size] = epoch
+
+def settle_head(queue):
+    """
+    Re-evaluate the head of a queue until its priority is current, just before popping it.
+
+    A stale head is re-sifted with its current priority and the new head is
+    checked in turn. Each flight is re-keyed at most once, since its stored
+    key is then current.
+
+    Args:
+        queue: A non-empty landing or takeoff queue
+
+    Returns:
+        tuple: The (priority, plane) pair now at the head
+    """
+    while True:
+        key, plane = cf.maxheap.peek_max(queue)
+        current = current_priority(plane)
+        if current == key:
+            return key, plane
+        cf.maxheap.update_priority(queue, plane, current)
+
+def best_priority(board):
+    """Highest priority queued on a board, or -1 if all of its queues are empty."""
+    i = tournament.best(board)
+    return tournament.head(board, i)[0] if i != -1 else -1
+
+def landing_candidates():
+    """
+    Heads of the landing queues in the order process_landing tries them.
+
+    Emergencies come first regardless of aircraft size, then the rest, larger
+    aircraft first. A head that cannot land now cannot land later in the same
+    pass either, so each queue is tried once.
+
+    Returns:
+        list: (plane, size) pairs
+    """
+    emergencies = []
+    others = []
+    for i in range(len(cf.QUEUE_ORDER) - 1, -1, -1):
+        item = tournament.head(cf.landing_board, i)
+        if item is not None:
+            (emergencies if item[1].is_emergency else others).append((item[1], cf.QUEUE_ORDER[i]))
+    return emergencies + others
+
+def process_landing():
+    """
+    Process the highest priority landing request, prioritizing emergencies and larger aircraft.
+    
+    Returns:
+        bool: True if a landing was processed, False otherwise
+    """
+    for plane, size in landing_candidates():
+        if process_landing_helper(plane, size):
+            return True
+    return False
+
+def process_landing_helper(plane, size):
+    """
+    Helper function to process a specific landing plane.
+    
+    Args:
+        plane: The plane to process
+        size: Size category of the plane
+        
+    Returns:
+        bool: True if landing was processed, False otherwise
+    """
+    if plane.id not in cf.active_flights:
+        return False  # Skip if already processed
+    
+    # Queued flights are always due (see release_due_flights), so only a runway is needed
+    runway = cf.find_runway(plane)
+    if not runway:
+        return False
+    key, head = settle_head(cf.landing_queues[size])
+    cf.queue_changed(cf.landing_board, size)
+    if head is not plane:
+        return process_landing_helper(head, size)  # order changed once priorities were updated
+    key, plane = cf.maxheap.remove_max(cf.landing_queues[size])
+    cf.queue_changed(cf.landing_board, size)
+    start_landing(runway, plane)
+    return True
+
+def start_landing(runway, plane):
+    """Land a plane that was just taken out of its queue on a free runway."""
+    if cf.holding_table is not None:
+        cf.holding_table.untrack(plane)
+    cf.occupy_runway(runway, plane, cf.system_time + plane.operation_time)
+    runway["busy_minutes"] += plane.operation_time
+    _wakeup(runway["time_available"])
+    if cf.runway_bookings is not None:
+        settle_bookings(runway, plane)
+    cf.set_status(plane, "Emergency Landing" if plane.is_emergency else "Landing")
+    cf.log_event(f"{plane.status.upper()}: {plane.id} ({plane.type}) on Runway {runway['id']}",
+                 event_log.WARNING if plane.is_emergency else event_log.INFO)
+    if plane.holding_since is not None:
+        cf.holding_times.append(cf.system_time - plane.holding_since)
+    plane.in_holding = False
+    plane.holding_since = None
+   
+def process_takeoff():
+    """
+    Process the highest priority takeoff request.
+    
+    Returns:
+        bool: True if a takeoff was processed, False otherwise
+    """
+    # Process by size (largest to smallest)
+    for i in range(len(cf.QUEUE_ORDER) - 1, -1, -1):
+        item = tournament.head(cf.takeoff_board, i)
+        if item is not None and process_takeoff_helper(item[1], cf.QUEUE_ORDER[i]):
+            return True
+    
+    return False
+
+def process_takeoff_helper(plane, size):
+    """
+    Helper function to process a specific takeoff plane.
+    
+    Args:
+        plane: The plane to process
+        size: Size category of the plane
+        
+    Returns:
+        bool: True if takeoff was processed, False otherwise
+    """
+    if plane.id not in cf.active_flights:
+        return False
+    
+    # Queued flights are always due (see release_due_flights), so only a runway is needed
+    runway = cf.find_runway(plane)
+    if not runway:
+        cf.set_status(plane, "In Takeoff Queue")
+        return False
+    key, head = settle_head(cf.takeoff_queues[size])
+    cf.queue_changed(cf.takeoff_board, size)
+    if head is not plane:
+        return process_takeoff_helper(head, size)  # order changed once priorities were updated
+    key, plane = cf.maxheap.remove_max(cf.takeoff_queues[size])
+    cf.queue_changed(cf.takeoff_board, size)
+    start_takeoff(runway, plane)
+    return True
+
+def start_takeoff(runway, plane):
+    """Start the takeoff of a plane that was just taken out of its queue on a free runway."""
+    cf.occupy_runway(runway, plane, cf.system_time + plane.operation_time)
+    runway["busy_minutes"] += plane.operation_time
+    _wakeup(runway["time_available"])
+    if cf.runway_bookings is not None:
+        settle_bookings(runway, plane)
+    cf.set_status(plane, "Taking Off")
+    cf.log_event(f"TAKEOFF: {plane.id} ({plane.type}) from Runway {runway['id']}")
+
+def generate_traffic():
+    """
+    Randomly generate new arrival and departure planes based on probability.
+    """
+    if random.random() < cf.LANDING_TRAFFIC_PROBABILITY:
+        add_landing(cf.generate_plane(is_arrival=True))
+    if random.random() < cf.TAKEOFF_TRAFFIC_PROBABILITY:
+        add_takeoff(cf.generate_plane(is_arrival=False))
+
+def simulation_step():
+    """
+    Execute one minute of simulation time, updating all system components.
+    """
+    cf.system_time += max(1, round(cf.SIMULATION_SPEED))  # the clock counts whole minutes
+    process_minute(traffic_feed.release if traffic_feed is not None else generate_traffic)
+
+def process_minute(traffic=None):
+    """
+    Run the runway, flight state, traffic and dispatch phases at the current system time.
+
+    Args:
+        traffic: Function that adds this minute's new flights, or None for no new traffic
+
+    Returns:
+        bool: True if a landing or takeoff was started
+    """
+    if event_log.is_enabled(event_log.DEBUG):
+        cf.log_event(f"--- Simulation Time: {cf.clock_time(cf.system_time).strftime('%Y-%m-%d %H:%M:%S')} ---", event_log.DEBUG)
+    
+    update_runways()
+    update_plane_state()
+    if traffic is not None:
+        traffic()
+    release_due_flights()
+
+    reprioritize_emergencies()
+    refresh_priorities()
+    started = start_booked_operations() if cf.runway_bookings is not None else 0
+    started += dispatch()
+    if metrics.enabled:
+        metrics.record()
+    return started > 0
+
+def reprioritize_emergencies():
+    """Keep emergency arrivals at the top of their queues and forget emergencies that are gone."""
+    for plane in list(cf.emergency_flights):
+        if plane.id in cf.active_flights:
+            size = plane.type
+            if plane.is_arrival:  # Only for arrivals
+                cf.maxheap.update_priority(cf.landing_queues[size], plane, cf.EMERGENCY_PRIORITY)
+                cf.queue_changed(cf.landing_board, size)
+                cf.set_status(plane, "Emergency (Priority Landing)")
+        else:
+            del cf.emergency_flights[plane]
+
+def dispatch_round():
+    """
+    Start at most one landing and one takeoff, higher priority operation first.
+
+    Returns:
+        int: Number of operations started
+    """
+    # Determine which operation has higher priority
+    highest_landing_priority = best_priority(cf.landing_board)
+    highest_takeoff_priority = best_priority(cf.takeoff_board)
+    
+    # Execute higher priority operation first, then try the other if runways available
+    started = 0
+    if highest_landing_priority >= highest_takeoff_priority and tournament.best(cf.landing_board) != -1:
+        started += process_landing()
+        started += process_takeoff()
+    elif tournament.best(cf.takeoff_board) != -1:
+        started += process_takeoff()
+        started += process_landing()
+    return started
+
+def dispatch():
+    """
+    Assign waiting flights to free runways until no more can start this minute.
+
+    Rounds of dispatch_round repeat while they start something and a runway is
+    still free, so several runways freeing up in the same minute are all put
+    to use instead of one landing and one takeoff per minute. Within a round
+    emergencies, priority and size order apply as before, and each flight gets
+    the shortest free runway it fits (find_runway). A flight fits every runway
+    at least as long as its min_runway, so taking the shortest one never uses
+    up a runway that a later flight needed while a longer one was left over:
+    the greedy pass fills as many runways as any matching of queue heads to
+    runways could.
+
+    Returns:
+        int: Number of landings and takeoffs started
+    """
+    started = 0
+    while cf.free_runways:
+        # Stop early if no queued flight fits even the longest free runway
+        longest = cf.free_runways[-1][2]
+        if (cf.best_flight_for(cf.landing_board, longest) is None
+                and cf.best_flight_for(cf.takeoff_board, longest) is None):
+            break
+        count = dispatch_round()
+        if count == 0:
+            break
+        started += count
+    return started
+
+def create_emergency():
+    """
+    Flag a random active flight as an emergency situation.
+    """
+    if cf.active_flights:
+        candidates = cf.find_flights(lambda is_arrival, status, is_emergency:
+                                     status in ["In Landing Queue", "Holding", "In Takeoff Queue"] and not is_emergency)
+
+        if candidates:
+            plane = random.choice(candidates)
+            cf.set_status(plane, "Emergency Declared", emergency=True)
+            if cf.holding_table is not None:
+                cf.holding_table.untrack(plane)
+            cf.emergency_flights[plane] = None
+            cf.log_event(f"MANUAL EMERGENCY: Flight {plane.id}", event_log.WARNING)
+            size = plane.type
+            cf.maxheap.update_priority(cf.landing_queues[size], plane, cf.EMERGENCY_PRIORITY)
+            cf.queue_changed(cf.landing_board, size)
+            cf.log_event(f"Priority for emergency flight {plane.id} set to 10000")
+        else: cf.log_event("No non-emergency flights available.")
+    else: cf.log_event("No active flights.")
+
+def create_flight():
+    """
+    Create a new random flight (either arrival or departure).
+    """
+
+    is_arrival = random.random() < 0.5
+    plane = cf.generate_plane(is_arrival)
+    if is_arrival:
+        add_landing(plane)
+    else:
+        add_takeoff(plane)
+    cf.log_event(f"Flight {plane.id} added")
@@ -0,0 +1,176 @@
+"""
+Monte Carlo scenario sweeps over a process pool.
+
+Each combination of parameter values in a grid is simulated with a number of
+seeds, and the results are averaged into one table row per combination.
+Simulation state lives in module globals, so runs are isolated by process
+instead: every worker has its own copy of the modules and calls
+core_functions.reset_state() before each run. Runs use the discrete-event
+engine and are spread over all cores by default. Example:
+
+    python sweep.py --minutes 1440 --seeds 200 \\
+        --set LANDING_TRAFFIC_PROBABILITY=0.3,0.5 \\
+        --runways 6000,6500,8000,9500,11000,12000 6000,6500,8000,9500,11000,12000,13500
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import core_functions as cf
+import event_engine
+import event_log
+import run
+
+# Constants in core_functions that a sweep may vary
+PARAMETERS = ["FUEL_EMERGENCY_THRESHOLD", "HOLDING_PATTERN_FUEL_BURN", "MAX_HOLDING_TIME",
+              "PRIORITY_EPOCH", "LANDING_TRAFFIC_PROBABILITY", "TAKEOFF_TRAFFIC_PROBABILITY",
+              "RUNWAY_LENGTHS"]
+METRICS = ["completed", "diverted", "active", "holding_mean", "holding_max", "mean_runway_utilization"]
+
+_defaults = {name: getattr(cf, name) for name in PARAMETERS}  # values before any sweep job
+
+def run_one(job):
+    """
+    Run one seeded simulation with some constants overridden. Runs in a worker process.
+
+    Args:
+        job: (params, seed, minutes) where params maps names from PARAMETERS to values
+
+    Returns:
+        dict: The params and seed, plus the METRICS from run.summarize
+    """
+    params, seed, minutes = job
+    event_log.level = event_log.OFF
+    event_log.console = False
+    for name, value in _defaults.items():
+        setattr(cf, name, params.get(name, value))
+    if cf.holding_table is not None:
+        cf.holding_table.disable()
+    random.seed(seed)
+    cf.reset_state()
+    event_engine.reset()
+    event_engine.run(minutes)
+    summary = run.summarize(cf.system_time)
+    result = {"params": params, "seed": seed}
+    result.update((name, summary[name]) for name in METRICS)
+    return result
+
+def expand_grid(grid):
+    """Turn {name: [values]} into a list of {name: value} dicts, one per combination."""
+    for name in grid:
+        if name not in PARAMETERS:
+            raise ValueError(f"Unknown sweep parameter {name} (expected one of {', '.join(PARAMETERS)})")
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def sweep(grid, seeds, minutes, workers=None):
+    """
+    Simulate every combination of a parameter grid with several seeds.
+
+    Args:
+        grid: {parameter name: list of values}; names must be in PARAMETERS
+        seeds: Number of seeded runs per combination (seeds 0..seeds-1)
+        minutes: Simulated minutes per run
+        workers: Number of worker processes (default: all cores)
+
+    Returns:
+        list: One dict per run, as returned by run_one, in grid order
+    """
+    jobs = [(params, seed, minutes) for params in expand_grid(grid) for seed in range(seeds)]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_one, jobs, chunksize=chunksize))
+
+def aggregate(results):
+    """
+    Average the runs of each parameter combination.
+
+    Returns:
+        list: One row per combination with its parameters, the number of runs,
+              and the mean (and standard deviation, as <metric>_sd) of each metric
+    """
+    groups = {}
+    for result in results:
+        key = json.dumps(result["params"], sort_keys=True)
+        groups.setdefault(key, []).append(result)
+    rows = []
+    for key, runs in groups.items():
+        row = dict(runs[0]["params"])
+        row["runs"] = len(runs)
+        for name in METRICS:
+            values = [r[name] for r in runs]
+            row[name] = statistics.fmean(values)
+            row[name + "_sd"] = statistics.stdev(values) if len(values) > 1 else 0.0
+        rows.append(row)
+    return rows
+
+def _format(value):
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    if isinstance(value, (list, tuple)):
+        return ",".join(str(v) for v in value)
+    return str(value)
+
+def print_table(rows):
+    """Print aggregated rows as an aligned text table."""
+    if not rows:
+        return
+    columns = list(rows[0])
+    cells = [[_format(row[column]) for column in columns] for row in rows]
+    widths = [max(len(column), *(len(line[i]) for line in cells)) for i, column in enumerate(columns)]
+    print("  ".join(column.rjust(width) for column, width in zip(columns, widths)))
+    for line in cells:
+        print("  ".join(cell.rjust(width) for cell, width in zip(line, widths)))
+
+def _parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run seeded simulations over a grid of parameters on all cores.")
+    parser.add_argument("--minutes", type=int, default=1440, help="simulated minutes per run (default: one day)")
+    parser.add_argument("--seeds", type=int, default=20, help="seeded runs per parameter combination")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=V1,V2",
+                        help="values to try for a constant, e.g. MAX_HOLDING_TIME=20,30 (repeatable)")
+    parser.add_argument("--runways", nargs="+", metavar="L1,L2,...",
+                        help="runway configurations to try, each a comma-separated list of lengths")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--csv", metavar="PATH", help="also write the table to a CSV file")
+    parser.add_argument("--json", action="store_true", help="print the table as JSON")
+    args = parser.parse_args()
+
+    grid = {}
+    try:
+        for setting in args.set:
+            name, _, values = setting.partition("=")
+            if not values:
+                raise ValueError(f"--set expects NAME=V1,V2, got {setting!r}")
+            grid[name] = [_parse_value(v) for v in values.split(",")]
+        if args.runways:
+            grid["RUNWAY_LENGTHS"] = [[int(length) for length in config.split(",")] for config in args.runways]
+        expand_grid(grid)
+    except ValueError as error:
+        parser.error(str(error))
+    rows = aggregate(sweep(grid, args.seeds, args.minutes, args.workers))
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    else:
+        print_table(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Hierarchical timing wheel.
+
+Holds items that are due at whole-minute times and hands them back when the
+clock reaches their minute. Level 0 has one slot per minute for the next
+SLOTS minutes; each level above has slots SLOTS times as wide, so LEVELS
+levels cover SLOTS ** LEVELS minutes ahead and anything further waits in an
+overflow list. Adding an item is O(1); when the clock enters a new slot of a
+higher level, that slot's items are spread over the levels below
+("cascading"), so each item is moved at most LEVELS times before it fires.
+Advancing the clock one minute only looks at the slots for that minute, no
+matter how many items are waiting, and stretches with nothing due are skipped
+a whole slot at a time.
+
+Items cannot be removed; callers that may cancel keep a token with each item
+and ignore items whose token is no longer current when they fire.
+"""
+
+SLOTS_BITS = 6
+SLOTS = 1 << SLOTS_BITS  # slots per level
+LEVELS = 4               # 64 ** 4 minutes (about 32 years) before the overflow list
+
+def create(now):
+    """
+    Create an empty timing wheel.
+
+    Args:
+        now: Current minute; items due at or before it fire on the next advance
+
+    Returns:
+        dict: The wheel
+    """
+    return {"now": now, "levels": [[[] for _ in range(SLOTS)] for _ in range(LEVELS)],
+            "overflow": [], "due": [], "count": 0}
+
+def _place(wheel, minute, item):
+    """Put an item in the slot its minute falls in, relative to the wheel's current minute."""
+    now = wheel["now"]
+    if minute <= now:
+        wheel["due"].append(item)
+        return
+    for level in range(LEVELS):
+        shift = SLOTS_BITS * (level + 1)
+        if minute >> shift == now >> shift:
+            wheel["levels"][level][(minute >> (SLOTS_BITS * level)) & (SLOTS - 1)].append((minute, item))
+            return
+    wheel["overflow"].append((minute, item))
+
+def add(wheel, minute, item):
+    """Add an item that becomes due at a minute."""
+    _place(wheel, minute, item)
+    wheel["count"] += 1
+
+def _cascade(wheel, entries):
+    for minute, item in entries:
+        _place(wheel, minute, item)
+
+def advance(wheel, to):
+    """
+    Move the clock forward to a minute and collect the items that became due.
+
+    Args:
+        wheel: The timing wheel
+        to: New current minute (not before the wheel's current minute)
+
+    Returns:
+        list: The due items, in the order of their minutes
+    """
+    levels = wheel["levels"]
+    fired = wheel["due"]
+    wheel["due"] = []
+    now = wheel["now"]
+    while now < to and wheel["count"] > len(fired):
+        now += 1
+        wheel["now"] = now
+        # Entering a new slot of a higher level: spread its items over the levels below
+        if now & (SLOTS - 1) == 0:
+            top = 1
+            while top < LEVELS and (now >> (SLOTS_BITS * top)) & (SLOTS - 1) == 0:
+                top += 1
+            if top == LEVELS:
+                entries, wheel["overflow"] = wheel["overflow"], []
+                _cascade(wheel, entries)
+            for level in range(min(top, LEVELS - 1), 0, -1):
+                slot = (now >> (SLOTS_BITS * level)) & (SLOTS - 1)
+                entries, levels[level][slot] = levels[level][slot], []
+                _cascade(wheel, entries)
+            fired.extend(wheel["due"])
+            wheel["due"] = []
+            slot = levels[0][0]
+            if slot:
+                fired.extend(item for _, item in slot)
+                slot.clear()
+            # Nothing fires until the end of the widest aligned slot whose lower levels are empty
+            empty = 0
+            while empty < top and not any(levels[empty]):
+                empty += 1
+            if empty:
+                now = wheel["now"] = min(to, now | ((1 << (SLOTS_BITS * empty)) - 1))
+            continue
+        slot = levels[0][now & (SLOTS - 1)]
+        if slot:
+            fired.extend(item for _, item in slot)
+            slot.clear()
+    wheel["now"] = to  # the wheel is empty if the loop stopped early
+    wheel["count"] -= len(fired)
+    return fired
+
+def size(wheel):
+    """Return the number of items waiting in the wheel."""
+    return wheel["count"]
+
+# Testing
+
+def test_timing_wheel():
+    """Test that items fire exactly when the clock reaches their minute, across cascades and the overflow list."""
+    import bisect
+    import random
+    rng = random.Random(7)
+    for start in (0, 5, SLOTS - 1, SLOTS ** 2 - 3):
+        wheel = create(start)
+        due_at = {}
+        for i in range(400):
+            due_at[i] = start + rng.choice([1, 2, SLOTS - 1, SLOTS, SLOTS + 1, SLOTS ** 2, SLOTS ** 3 + 5,
+                                            SLOTS ** LEVELS + 9, rng.randrange(1, 5000)])
+            add(wheel, due_at[i], i)
+        assert size(wheel) == 400, "All items should be waiting."
+        add(wheel, start, "now")
+        assert advance(wheel, start) == ["now"], "An item due now should fire on the next advance."
+
+        now = start
+        fired = set()
+        deadlines = sorted(due_at.values())
+        while now < start + SLOTS ** LEVELS + 20:
+            step = 1 if rng.random() < 0.7 else rng.randrange(2, 3000)  # single minutes and long jumps
+            if now > start + 5000:
+                step *= SLOTS ** 2
+            items = advance(wheel, now + step)
+            assert all(now < due_at[i] <= now + step for i in items), f"Item fired outside ({now}, {now + step}]."
+            assert [due_at[i] for i in items] == sorted(due_at[i] for i in items), "Items should fire in time order."
+            fired.update(items)
+            now += step
+            assert len(fired) == bisect.bisect_right(deadlines, now), f"Items due by {now} did not fire."
+        assert len(fired) == 400 and size(wheel) == 0, "Every item should fire exactly once."
+
+def run_all_tests():
+    test_timing_wheel()
+    print("All tests passed!")
+
+if __name__ == '__main__':
+    run_all_tests()
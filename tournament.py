@@ -0,0 +1,124 @@
+"""
+Tournament tree over several priority queues.
+
+Each leaf is one max-heap (one per aircraft size); every internal node holds
+the leaf whose head has the higher key of its two children, so the root names
+the queue holding the best flight overall and the head of each leaf is the best
+flight of its category, both in O(1). When a queue's head changes, only the
+path from its leaf to the root is recomputed, O(log k) for k queues.
+
+Leaves are kept in a fixed order (the landing and takeoff boards use aircraft
+types ordered by minimum runway length), so "best flight among the first j
+queues" is a range query, which answers "best flight that fits this runway"
+without looking at every queue.
+"""
+
+def create(queues):
+    """
+    Create a tournament over a list of priority queues.
+
+    Args:
+        queues: Max-heaps in leaf order; they are referenced, not copied
+
+    Returns:
+        dict: The tournament
+    """
+    size = 1
+    while size < len(queues):
+        size *= 2
+    board = {"queues": list(queues), "size": size, "tree": [-1] * (2 * size)}
+    update_all(board)
+    return board
+
+def _better(board, i, j):
+    """Return whichever of leaves i and j (i left of j, -1 for none) has the higher head key."""
+    if i == -1:
+        return j
+    if j == -1:
+        return i
+    queues = board["queues"]
+    # Ties go to the later leaf (the larger aircraft), like a scan from Large to Small
+    return i if queues[i][0][0] > queues[j][0][0] else j
+
+def update(board, i):
+    """Recompute the path from leaf i to the root after the head of queue i changed."""
+    tree = board["tree"]
+    node = board["size"] + i
+    tree[node] = i if board["queues"][i] else -1
+    node //= 2
+    while node:
+        tree[node] = _better(board, tree[2*node], tree[2*node + 1])
+        node //= 2
+
+def update_all(board):
+    """Rebuild every node, e.g. after the queues were changed without telling the board."""
+    tree = board["tree"]
+    size = board["size"]
+    for i in range(size):
+        tree[size + i] = i if i < len(board["queues"]) and board["queues"][i] else -1
+    for node in range(size - 1, 0, -1):
+        tree[node] = _better(board, tree[2*node], tree[2*node + 1])
+
+def best(board):
+    """Return the index of the queue with the highest head key, or -1 if all are empty."""
+    return board["tree"][1]
+
+def best_in(board, lo, hi):
+    """Return the index of the queue with the highest head key among leaves lo..hi-1, or -1."""
+    tree = board["tree"]
+    lo += board["size"]
+    hi += board["size"]
+    left = right = -1
+    while lo < hi:
+        if lo & 1:
+            left = _better(board, left, tree[lo])
+            lo += 1
+        if hi & 1:
+            hi -= 1
+            right = _better(board, tree[hi], right)
+        lo //= 2
+        hi //= 2
+    return _better(board, left, right)
+
+def head(board, i):
+    """Return the (key, value) pair at the head of queue i, or None if it is empty."""
+    queue = board["queues"][i]
+    return queue[0] if queue else None
+
+# Testing
+
+def test_tournament():
+    """Test best, best_in and updates against a brute-force scan."""
+    import maxheap
+    queues = [maxheap.create_indexed_priority_queue() for _ in range(5)]
+    board = create(queues)
+    assert best(board) == -1 and best_in(board, 0, 5) == -1, "Empty board should have no best queue."
+
+    for i, key in [(0, 4), (1, 9), (2, 9), (3, 1), (4, 7), (0, 12)]:
+        maxheap.add(queues[i], key, f"q{i}k{key}")
+        update(board, i)
+
+    def scan(lo, hi):
+        found = -1
+        for i in range(lo, hi):
+            if queues[i] and (found == -1 or queues[i][0][0] >= queues[found][0][0]):
+                found = i
+        return found
+
+    assert best_in(board, 1, 3) == 2, "Ties should go to the later queue."
+    for _ in range(4):
+        for lo in range(5):
+            for hi in range(lo, 6):
+                assert best_in(board, lo, hi) == scan(lo, hi), f"best_in({lo}, {hi}) disagrees with a scan."
+        assert best(board) == scan(0, 5), "Root should name the best queue."
+        i = best(board)
+        maxheap.remove_max(queues[i])
+        update(board, i)
+    assert head(board, 0) == (4, "q0k4") and head(board, 1) is None, "head should return the queue head."
+
+def run_all_tests():
+    test_tournament()
+    print("All tests passed!")
+
+if __name__ == '__main__':
+    run_all_tests()